@@ -3,7 +3,7 @@
 """
 
 import os
-import re
+import hashlib
 import tempfile
 import sys
 import textwrap
@@ -21,6 +21,48 @@ except ImportError:
 else:
     COVERAGE_ENABLED = True
 
+# Glob patterns matching files we never want to measure coverage of.
+_MY_FILES_GLOB = os.path.join(os.path.dirname(__file__), "*")
+_TEMPDIR_GLOB = os.path.join(tempfile.gettempdir(), "*")
+
+_DOT_TO_SLASH = str.maketrans(".", "/")
+
+# Name of the file storing the hash of the data used to render the HTML report.
+_HTML_STAMP_FILENAME = ".hunittest_cov_hash"
+
+# Options changing the content of the HTML report for the same data.
+_HTML_STAMP_OPTIONS = (
+    "html:directory",
+    "html:title",
+    "html:extra_css",
+    "html:skip_covered",
+    "html:skip_empty",
+    "report:exclude_lines",
+    "report:partial_branches",
+    "report:ignore_errors",
+    "report:precision",
+)
+
+def _update_hash_from_file(h, filename, chunk_size=1 << 20):
+    with open(filename, "rb") as stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            h.update(chunk)
+
+def _html_report_stamp(cov):
+    """Return a digest of the coverage version, HTML options and data file.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(coverage.__version__.encode())
+    for option in _HTML_STAMP_OPTIONS:
+        try:
+            value = cov.get_option(option)
+        except coverage.CoverageException:
+            # Not supported by this version of coverage.
+            value = None
+        h.update("\0{}={!r}".format(option, value).encode())
+    _update_hash_from_file(h, cov.data_files.filename)
+    return h.hexdigest()
+
 def get_user_test_files(test_names, top_level_dir):
     s = set()
     for test_spec in test_names:
@@ -32,22 +74,23 @@ def get_user_test_files(test_names, top_level_dir):
             if os.path.isfile(path):
                 s.add(path)
         else:
-            path = re.subn(r"\.", "/", pkgname)[0]
+            path = pkgname.translate(_DOT_TO_SLASH)
             path = os.path.join(path, "*")
             s.add(path)
     return s
 
 def get_my_test_files():
     # My own files
-    return [os.path.join(os.path.dirname(__file__), "*")]
+    return (_MY_FILES_GLOB,)
 
 def get_test_files_to_omit(test_names, top_level_dir):
-    l = get_my_test_files()
-    l.append(os.path.join(tempfile.gettempdir(), "*"))
-    l.append("/tmp/*")
+    l = list(get_my_test_files())
+    l.append(_TEMPDIR_GLOB)
+    if _TEMPDIR_GLOB != "/tmp/*":
+        l.append("/tmp/*")
     if test_names is not None:
         l.extend(get_user_test_files(test_names, top_level_dir))
-    return l
+    return tuple(l)
 
 def write_sitecustomize(path):
     with open(path, "w") as stream:
@@ -174,6 +217,33 @@ class CoverageInstrument(object):
         self._drop_combined_data_suffix()
         self.combined = True
 
+    def _html_report(self):
+        """Render the HTML report unless nothing changed since last time.
+
+        A hash of the coverage version, the HTML report options and the data
+        file is stored in the report directory after each rendering and
+        compared on the next one. The source files are not hashed: the skip
+        assumes they have not changed if the data file has not. An edit
+        keeping the same executed line numbers thus leaves the report stale;
+        remove the report directory to force its rendering.
+        """
+        try:
+            data_hash = _html_report_stamp(self.cov)
+        except OSError:
+            self.cov.html_report()
+            return
+        stamp = os.path.join(self.cov.get_option("html:directory"),
+                             _HTML_STAMP_FILENAME)
+        try:
+            with open(stamp) as stream:
+                if stream.read() == data_hash:
+                    return
+        except OSError:
+            pass
+        self.cov.html_report()
+        with open(stamp, "w") as stream:
+            stream.write(data_hash)
+
     def report(self):
         if self.cov is None:
             return
@@ -184,7 +254,7 @@ class CoverageInstrument(object):
         if "annotate" in self.reporters:
             self.cov.annotate()
         if "html" in self.reporters:
-            self.cov.html_report()
+            self._html_report()
         if "xml" in self.reporters:
             self.cov.xml_report()
 
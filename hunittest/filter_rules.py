@@ -5,7 +5,6 @@
 
 from enum import Enum
 from collections import namedtuple
-import functools
 import re
 import argparse
 import fnmatch
@@ -42,11 +41,6 @@ class Rule(namedtuple("BaseRule", ("operator", "pattern"))):
         return "{} /{}/".format(self.operator.value, self.pattern)
 
     def match(self, string):
-        # FIXME(Nicolas Despres): Remove this test. It is here only
-        #  because when used from hunittest.cli.reported_collect() we
-        #  may encounter other kind of object.
-        if not isinstance(string, str):
-            return True
         # print("STRING", repr(string))
         if re.search(self.pattern, string):
             if self.include:
@@ -109,18 +103,18 @@ class FilterRules(object):
         return iter(self._rules)
 
     def __call__(self, iterable, key=None):
-        # print("FILTERRULE ON", repr(iterable))
-        def matcher(rule, item):
-            # print("ITEM", repr(item))
+        rules = tuple(self._rules)
+        def matcher(item):
             if key is None:
                 string = item
             else:
                 string = key(item)
-            # print("TESTED STRING", string)
-            return rule.match(string)
-        for rule in self._rules:
-            iterable = filter(functools.partial(matcher, rule), iterable)
-        return iterable
+            # Let through non-string items (e.g. the SkippedTestSpec
+            # yielded by hunittest.cli.reported_collect()).
+            if not isinstance(string, str):
+                return True
+            return all(rule.match(string) for rule in rules)
+        return filter(matcher, iterable)
 
     def __repr__(self):
         return "{:s}([{}])".format(type(self).__name__,
@@ -10,15 +10,20 @@ See also:
 
 
 import sys
+import os
+import codecs
+import signal
+import time
 import traceback
 
-from hunittest.termlib import ANSI_ESCAPE_PATTERN
-from hunittest.termlib import strip_ansi_escape
+from hunittest.termlib import ANSI_PREFIX_CHAR
 from hunittest.termlib import ansi_string_truncinfo
-from hunittest.termlib import truncate_ansi_string
 from hunittest.termlib import TermInfo
+from hunittest.termlib import isatty_term
 
-# TODO(Nicolas Despres): Handle terminal resize events.
+# Delay after which the terminal width is queried again when we cannot be
+# notified of terminal resize events.
+_TERMWIDTH_TTL = 0.25
 
 class LinePrinter(object):
     """Robust line overwriting in terminal.
@@ -38,23 +43,61 @@ class LinePrinter(object):
 
     def __init__(self, output=sys.stdout, isatty=None, quiet=False,
                  color_mode="auto", verbose=False):
-        self._termnfo = TermInfo(output, color_mode)
-        self._cr = self._termnfo.carriage_return
-        if not self._cr:
-            self._cr = "\r"
+        # Querying the terminal capabilities is costly (curses.setupterm()).
+        # It is delayed until we really need them.
+        self._termnfo = None
+        self._color_mode = color_mode
+        self._cr = None
+        self._termwidth = None
+        self._termwidth_time = None
+        self._prev_sigwinch_handler = None
+        self._sigwinch_installed = False
         self._output = output
-        self._isatty = self._termnfo.isatty if isatty is None else isatty
+        # Bound once since they are called for every progress line.
+        self._write_impl = output.write
+        self._flush_impl = output.flush
+        self._isatty = isatty_term(output) if isatty is None else isatty
+        self._raw_fd = self._get_raw_fd() if self._isatty else None
+        self._raw_errors = getattr(output, "errors", None) or "strict"
         self._quiet = quiet
         self._verbose = verbose
         self.reset()
 
     def reset(self):
         self._prev_line = None
+        self._prev_visual_len = None
         self._last_is_nl = True
 
     def _write(self, string):
         self._last_is_nl = string.endswith("\n")
-        self._output.write(string)
+        self._write_impl(string)
+
+    def _get_raw_fd(self):
+        """Return the file descriptor to write overwritten lines to.
+
+        Return None if we cannot bypass the text layer of the output stream.
+        """
+        try:
+            fd = self._output.fileno()
+            encoding = codecs.lookup(self._output.encoding).name
+        except (AttributeError, LookupError, TypeError, ValueError, OSError):
+            return None
+        if encoding != "utf-8":
+            return None
+        return fd
+
+    def _raw_write(self, string):
+        """Write and flush *string* bypassing the output text layer if we can.
+        """
+        if self._raw_fd is None:
+            self._write_impl(string)
+            self._flush_impl()
+            return
+        # Keep ordering with what was written through the text layer.
+        self._flush_impl()
+        data = memoryview(string.encode("utf-8", self._raw_errors))
+        while data:
+            data = data[os.write(self._raw_fd, data):]
 
     def write(self, string):
         if not isinstance(string, str):
@@ -71,8 +114,8 @@ class LinePrinter(object):
         """
         if self._quiet:
             return
-        self._output.write(string)
-        self._output.flush()
+        self._write_impl(string)
+        self._flush_impl()
 
     def write_nl(self, line, auto=True):
         if not isinstance(line, str):
@@ -86,15 +129,67 @@ class LinePrinter(object):
             self.write("\n")
         self.reset()
 
+    def _query_termwidth(self):
+        try:
+            columns = os.get_terminal_size(self._output.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+            columns = 0
+        if not columns:
+            columns = self.term_info.columns
+        return columns
+
     def _get_termwidth(self):
         assert self._isatty
-        return self._termnfo.columns
+        if self._termwidth is not None and not self._sigwinch_installed:
+            if time.monotonic() - self._termwidth_time >= _TERMWIDTH_TTL:
+                self._termwidth = None
+        if self._termwidth is None:
+            self._termwidth = self._query_termwidth()
+            self._termwidth_time = time.monotonic()
+        return self._termwidth
+
+    def _on_sigwinch(self, signum, frame):
+        # Only invalidate the cache; the width is queried on next use.
+        self._termwidth = None
+
+    def _install_sigwinch_handler(self):
+        if not self._isatty or not hasattr(signal, "SIGWINCH"):
+            return
+        try:
+            self._prev_sigwinch_handler = signal.signal(signal.SIGWINCH,
+                                                        self._on_sigwinch)
+        except ValueError:
+            # Signal handlers can only be set from the main thread.
+            return
+        # Restart system calls interrupted by a resize, so that tests run
+        # in-process never see EINTR because of us.
+        signal.siginterrupt(signal.SIGWINCH, False)
+        self._sigwinch_installed = True
+
+    def _restore_sigwinch_handler(self):
+        if not self._sigwinch_installed:
+            return
+        handler = self._prev_sigwinch_handler
+        if handler is None:
+            handler = signal.SIG_DFL
+        signal.signal(signal.SIGWINCH, handler)
+        self._prev_sigwinch_handler = None
+        self._sigwinch_installed = False
+
+    def _get_cr(self):
+        if self._cr is None:
+            self._cr = self.term_info.carriage_return
+            if not self._cr:
+                self._cr = "\r"
+        return self._cr
 
     def overwrite_message(self, *args, ellipse_index=None, ellipse="..."):
         for i, arg in enumerate(args):
             if not isinstance(arg, str):
                 raise TypeError("positional argument {} must be a str, not {}"
                                 .format(i, type(arg).__name__))
+        if self._quiet:
+            return
         if ellipse_index is None or not self.has_overwrite:
             return self.overwrite("".join(args))
         termwidth = self._get_termwidth()
@@ -119,39 +214,56 @@ class LinePrinter(object):
         if not isinstance(line, str):
             raise TypeError("line must be str, not {}"
                             .format(type(line).__name__))
-        # Do nothing if the line has not changed.
-        if self._prev_line is not None and self._prev_line == line:
+        if self._quiet:
+            return
+        # Do nothing if the line has not changed. String equality already
+        # bails out early on identity and length mismatch.
+        if line == self._prev_line:
             return
+        # Write everything at once to limit the number of system calls.
+        parts = []
         written_line = line
+        line_visual_len = None
         if self.has_overwrite:
-            self.write(self._cr)
+            parts.append(self._get_cr())
             termwidth = self._get_termwidth()
-            if termwidth:
+            if ANSI_PREFIX_CHAR not in line \
+               and (not termwidth or len(line) <= termwidth):
+                # Common case: a plain line fitting in the terminal.
+                line_visual_len = len(line)
+                line_has_ansi = False
+            elif termwidth:
                 truncinfo = ansi_string_truncinfo(line, termwidth)
                 trunc_pos, line_visual_len, line_has_ansi = truncinfo
                 written_line = line[:trunc_pos]
-        self.write(written_line)
+            else:
+                truncinfo = ansi_string_truncinfo(line, len(line))
+                _, line_visual_len, line_has_ansi = truncinfo
+        parts.append(written_line)
         if not self.has_overwrite:
-            self.write("\n")
+            parts.append("\n")
         if self.has_overwrite and self._prev_line is not None:
-            if self._termnfo.clear_eol:
-                self.write(self._termnfo.clear_eol)
+            if self.term_info.clear_eol:
+                parts.append(self.term_info.clear_eol)
             else:
-                truncinfo = ansi_string_truncinfo(self._prev_line, termwidth)
-                _, prev_line_visual_len, _ = truncinfo
+                prev_line_visual_len = self._prev_visual_len
                 if line_visual_len < prev_line_visual_len:
-                    eraser = ""
                     if line_has_ansi:
-                        eraser += self._termnfo.reset_all
-                    eraser += " " * (prev_line_visual_len - line_visual_len)
-                    self.write(eraser)
+                        parts.append(self.term_info.reset_all)
+                    parts.append(
+                        " " * (prev_line_visual_len - line_visual_len))
+        string = "".join(parts)
+        self._last_is_nl = string.endswith("\n")
+        self._raw_write(string)
         self._prev_line = line
-        self._output.flush()
+        self._prev_visual_len = line_visual_len
 
     def overwrite_nl(self, line, auto=True):
         if not isinstance(line, str):
             raise TypeError("line must be str, not {}"
                             .format(type(line).__name__))
+        if self._quiet:
+            return
         self.overwrite(line)
         self.new_line(auto=auto)
 
@@ -186,18 +298,27 @@ class LinePrinter(object):
 
     @property
     def term_info(self):
+        if self._termnfo is None:
+            self._termnfo = TermInfo(self._output, self._color_mode)
         return self._termnfo
 
     def show_cursor(self):
-        self._write_termctrl(self._termnfo.show_cursor)
+        # Cursor control sequences are useless when not writing to a terminal.
+        if not self._isatty:
+            return
+        self._write_termctrl(self.term_info.show_cursor)
 
     def hide_cursor(self):
-        self._write_termctrl(self._termnfo.hide_cursor)
+        if not self._isatty:
+            return
+        self._write_termctrl(self.term_info.hide_cursor)
 
     def __enter__(self):
+        self._install_sigwinch_handler()
         self.hide_cursor()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.show_cursor()
+        self._restore_sigwinch_handler()
         return False
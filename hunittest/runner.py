@@ -4,28 +4,77 @@
 
 import unittest
 import multiprocessing as mp
+import importlib
+import functools
+import itertools
 import time
 import sys
 import traceback
 from collections import namedtuple
+from collections import deque
+from datetime import timedelta
 
 from hunittest.unittestresultlib import HTestResultClient
 from hunittest.unittestresultlib import TestResultMsg
+from hunittest.unittestresultlib import SubtestResult
+from hunittest.unittestresultlib import Status
+from hunittest.unittestresultlib import unpack_worker_msg
 from hunittest.coveragelib import CoverageInstrument
 
-class _ErrMsg(namedtuple("ErrMsg", ("type", "value", "msg"))):
+class _ErrMsg(namedtuple("ErrMsg", ("type_name", "msg"))):
     """Message representing an uncaught exception raised in the worker process.
+
+    Only the formatted traceback is sent since the exception itself may not
+    be picklable.
     """
 
     def print_exception(self, prefix):
-        for item in self.msg:
-            for line in item.splitlines():
-                print(prefix, line)
+        for line in self.msg.splitlines():
+            print(prefix, line)
+
+def _lost_test_result_msg(test_name, reason):
+    """Return an error result for the test *test_name* a worker lost."""
+    exc = RuntimeError(reason)
+    error = (RuntimeError, exc,
+             traceback.format_exception_only(RuntimeError, exc))
+    return TestResultMsg(stdout="",
+                         stderr="",
+                         test_name=test_name,
+                         total_time=timedelta(0),
+                         results=[SubtestResult(status=Status.ERROR,
+                                                error=error,
+                                                reason=None,
+                                                params=None)])
 
 _testLoader = unittest.loader.defaultTestLoader
 
+@functools.lru_cache(maxsize=256)
+def _get_test_case_class(class_name):
+    """Return the TestCase class called *class_name* or None if it is not one.
+    """
+    module_name, _, attr = class_name.rpartition(".")
+    if not module_name:
+        return None
+    try:
+        module = importlib.import_module(module_name)
+    except Exception:
+        return None
+    cls = getattr(module, attr, None)
+    if isinstance(cls, type) and issubclass(cls, unittest.TestCase):
+        return cls
+    return None
+
+def _load_single_test(test_name):
+    # Most test names refer to a test method. Instantiate it directly from
+    # its (cached) class rather than resolving the full name each time.
+    class_name, _, method_name = test_name.rpartition(".")
+    cls = _get_test_case_class(class_name)
+    if cls is not None and callable(getattr(cls, method_name, None)):
+        return _testLoader.suiteClass([cls(method_name)])
+    return _testLoader.loadTestsFromName(test_name)
+
 def _worker_run_aux(test_name, result):
-    test = _testLoader.loadTestsFromNames([test_name])
+    test = _load_single_test(test_name)
     test(result)
 
 def _worker_run(conn, worker_id, worker_kwargs, cov_args):
@@ -46,13 +95,19 @@ def _worker_run(conn, worker_id, worker_kwargs, cov_args):
             else:
                 if msg is None:
                     done = True
-                elif isinstance(msg, str):
+                elif isinstance(msg, list):
                     try:
-                        _worker_run_aux(msg, result)
+                        for test_name in msg:
+                            # Do not run the rest of the chunk if we have
+                            # failed and -f/--failfast is set.
+                            if result.shouldStop:
+                                break
+                            _worker_run_aux(test_name, result)
                     except (Exception, KeyboardInterrupt, SystemExit) as e:
                         msg_obj = _ErrMsg(
-                            type(e), e,
-                            traceback.format_exception(*sys.exc_info()))
+                            type(e).__name__,
+                            "".join(traceback.format_exception(
+                                *sys.exc_info())))
                         conn.send((worker_id, msg_obj))
                         done = True
                 else:
@@ -60,29 +115,86 @@ def _worker_run(conn, worker_id, worker_kwargs, cov_args):
                                        "{!r}".format(worker_id, msg))
 
 def run_concurrent_tests(test_names, result, njobs=1, cov_args=None,
-                         worker_kwargs=None):
+                         worker_kwargs=None, chunk_size=None):
     """Run multiple tests concurrently using multiple process.
 
     This function is executed in the master process. It distribute tests to
-    each worker. The scheduling is trivial: when a worker finished the next
-    not-yet-run test spec is sent to it. Workers later send a TestResultMsg back
-    to the master process. If an error occurred the worker is stopped and never
-    re-spawned. A bidirectional connection pipe
-    connects the master process to each of its worker.
+    each worker by chunk of *chunk_size* tests. The scheduling is trivial:
+    when a worker finished its chunk the next not-yet-run tests are sent to
+    it. Workers send a TestResultMsg back to the master process for each
+    test. If an error occurred the worker is stopped and never
+    re-spawned: the test it was running is reported as an error and the
+    rest of its chunk is sent to the other workers. For that reason, a
+    worker without tests left to run is only stopped once all the others
+    are done. A bidirectional connection pipe connects the master process
+    to each of its worker.
     """
 
-    def start_test(conn, test_name):
-        conn.send(test_name)
-        result.startTest(test_name)
+    def send_chunk(conn):
+        nonlocal t
+        if lost:
+            chunk = [lost.popleft()
+                     for _ in range(min(chunk_size, len(lost)))]
+        else:
+            chunk = test_names[t:t+chunk_size]
+            t += len(chunk)
+        conn.send(chunk)
+        pending[conn].extend(chunk)
+
+    def worker_lost(conn):
+        """Handle the tests left to the worker connected to *conn*.
+
+        Called when the worker has exited without being told to.
+        """
+        conn_pending = pending[conn]
+        if not conn_pending:
+            return
+        # The worker died while running the first one.
+        result.process_result(_lost_test_result_msg(
+            conn_pending.popleft(),
+            "worker {} died while running this test"
+            .format(worker_ids[conn])))
+        lost.extend(conn_pending)
+        conn_pending.clear()
+
+    def dispatch_idle():
+        """Send the lost tests to idle workers.
+
+        Idle workers are stopped once no more tests can be lost, that is
+        when no worker has pending tests anymore.
+        """
+        while idle and lost and not result.shouldStop:
+            conn = idle.pop()
+            send_chunk(conn)
+            result.startTest(pending[conn][0])
+        if result.shouldStop or not any(pending.values()):
+            for conn in idle:
+                stop_worker(conn)
+            idle.clear()
+
+    def will_stop(result_msg):
+        """Tell whether processing *result_msg* will stop the run."""
+        if result.shouldStop:
+            return True
+        return result.failfast \
+            and any(r.status.is_erroneous() for r in result_msg.results)
 
     def stop_worker(conn):
         """Tell the worker connected to the given *conn* pipe to stop."""
         conn.send(None)
+        stopped.add(conn)
 
     ntest = len(test_names)
     if ntest == 0:
         return
     nproc = min(ntest, njobs)
+    if chunk_size is None:
+        # Send one test at a time in failfast mode so that we stop as soon
+        # as possible.
+        if result.failfast:
+            chunk_size = 1
+        else:
+            chunk_size = max(1, ntest // (nproc * 8))
     ### Create workers
     conns = []
     workers = []
@@ -98,43 +210,87 @@ def run_concurrent_tests(test_names, result, njobs=1, cov_args=None,
         # ensures that when p closes its handle for the writable end,
         # wait() will promptly report the readable end as being ready.
         worker_conn.close()
+    worker_ids = {conn: i for i, conn in enumerate(conns)}
+    # Tests sent to each worker and not finished yet.
+    pending = {conn: deque() for conn in conns}
+    # Tests sent to a worker which died before running them.
+    lost = deque()
+    # Workers done with their tests, kept in case some get lost.
+    idle = []
+    # Workers we have told to stop.
+    stopped = set()
     ### Distribute work
     try:
-        # Bootstrap the pool of workers by sending one test to each of them.
+        # Bootstrap the pool of workers by sending one chunk to each of them.
         t = 0
-        while t < nproc:
-            start_test(conns[t], test_names[t])
-            t += 1
+        for conn in conns:
+            send_chunk(conn)
+            result.startTest(pending[conn][0])
         while conns:
             for conn in mp.connection.wait(conns):
-                try:
-                    msg = conn.recv()
-                except EOFError:
-                    # The other end of the connection has been closed. Remove
-                    # it so that we exit the loop when the connections list is
-                    # empty.
-                    conns.remove(conn)
-                else:
-                    # Print results and send new test.
-                    worker_id, obj = msg
-                    if isinstance(obj, _ErrMsg):
-                        obj.print_exception("[worker{}]".format(worker_id))
-                    elif isinstance(obj, TestResultMsg):
-                        result.process_result(obj)
-                        # Start next test if there is still some
-                        if t < ntest and not result.shouldStop:
-                            start_test(conn, test_names[t])
-                            t += 1
-                        else:
-                            stop_worker(conn)
+                # Drain all the messages already received from this worker
+                # before to wait again.
+                while True:
+                    try:
+                        msg = unpack_worker_msg(conn.recv_bytes())
+                    except EOFError:
+                        # The other end of the connection has been closed.
+                        # Remove it so that we exit the loop when the
+                        # connections list is empty.
+                        conns.remove(conn)
+                        worker_lost(conn)
+                        dispatch_idle()
+                        break
                     else:
-                        raise RuntimeError("main process cannot handle "
-                                           "message {!r} "
-                                           "from worker {}"
-                                           .format(obj, worker_id))
+                        # Print results and send new tests.
+                        worker_id, obj = msg
+                        if isinstance(obj, _ErrMsg):
+                            obj.print_exception(
+                                "[worker{}]".format(worker_id))
+                        elif isinstance(obj, TestResultMsg) \
+                             and not pending[conn]:
+                            # The worker was told to stop in the middle of
+                            # its chunk and carries on with it. Drop the
+                            # results of these tests since we have not
+                            # started them.
+                            pass
+                        elif isinstance(obj, TestResultMsg):
+                            conn_pending = pending[conn]
+                            conn_pending.popleft()
+                            # Send the next tests when the worker is done
+                            # with its chunk, before to process the result
+                            # so that the worker does not wait for us to
+                            # print it.
+                            if will_stop(obj):
+                                conn_pending.clear()
+                                stop_worker(conn)
+                            elif not conn_pending:
+                                if lost or t < ntest:
+                                    send_chunk(conn)
+                                else:
+                                    idle.append(conn)
+                            result.process_result(obj)
+                            if conn_pending:
+                                result.startTest(conn_pending[0])
+                            if idle:
+                                dispatch_idle()
+                        else:
+                            raise RuntimeError("main process cannot handle "
+                                               "message {!r} "
+                                               "from worker {}"
+                                               .format(obj, worker_id))
+                    if not conn.poll():
+                        break
+        # All workers died before running these tests.
+        if not result.shouldStop:
+            for test_name in itertools.chain(lost, test_names[t:]):
+                result.startTest(test_name)
+                result.process_result(_lost_test_result_msg(
+                    test_name, "no worker left to run this test"))
     finally:
         for conn in conns:
-            stop_worker(conn)
+            if conn not in stopped:
+                stop_worker(conn)
             conn.close()
         ### Wait for workers to finish.
         # FIXME(Nicolas Despres): Add a timeout on join()
@@ -142,10 +298,10 @@ def run_concurrent_tests(test_names, result, njobs=1, cov_args=None,
             p.join()
 
 def run_monoproc_tests(test_names, result, cov):
+    load = _load_single_test
     with cov:
         for test_name in test_names:
             # If a test has failed and -f/--failfast is set we must exit now.
             if result.shouldStop:
                 break
-            test = _testLoader.loadTestsFromNames([test_name])
-            test(result)
+            load(test_name)(result)
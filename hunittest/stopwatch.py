@@ -3,21 +3,34 @@
 """
 
 
+import time
 from datetime import datetime
 from datetime import timedelta
 
 
+def _ns_to_timedelta(ns):
+    return timedelta(microseconds=ns // 1000)
+
 class StopWatch(object):
+    """Measure elapsed time using the performance counter.
+
+    Times are kept as integer nanoseconds internally and are only
+    converted to timedelta when queried.
+    """
+
+    __slots__ = ("_started_at", "_started_ns", "_last_split_ns",
+                 "_last_split_at_ns", "_total_split_ns", "_splits_count")
 
     def __init__(self):
         self.reset()
 
     def reset(self):
         self._started_at = None
-        self._last_split_time = None
-        self._last_split_at = None
-        self._total_split_time = None
-        self._tick_count = 0
+        self._started_ns = None
+        self._last_split_ns = None
+        self._last_split_at_ns = None
+        self._total_split_ns = None
+        self._splits_count = 0
 
     @property
     def started_at(self):
@@ -25,15 +38,19 @@ class StopWatch(object):
 
     @property
     def last_split_at(self):
-        return self._last_split_at
+        if not self.is_started:
+            return None
+        return self._started_at \
+            + _ns_to_timedelta(self._last_split_at_ns - self._started_ns)
 
     def start(self):
         if self.is_started:
             raise RuntimeError("stopwatch already started")
         self._started_at = datetime.utcnow()
-        self._last_split_at = self._started_at
-        self._last_split_time = None
-        self._total_split_time = None
+        self._started_ns = time.perf_counter_ns()
+        self._last_split_at_ns = self._started_ns
+        self._last_split_ns = None
+        self._total_split_ns = None
         self._splits_count = 0
 
     @property
@@ -46,14 +63,14 @@ class StopWatch(object):
 
     def split(self):
         self._check_is_started()
-        now = datetime.utcnow()
-        self._last_split_time = now - self._last_split_at
-        self._last_split_at = now
+        now = time.perf_counter_ns()
+        self._last_split_ns = now - self._last_split_at_ns
+        self._last_split_at_ns = now
         self._splits_count += 1
-        if self._total_split_time is None:
-            self._total_split_time = self._last_split_time
+        if self._total_split_ns is None:
+            self._total_split_ns = self._last_split_ns
         else:
-            self._total_split_time += self._last_split_time
+            self._total_split_ns += self._last_split_ns
 
     @property
     def splits_count(self):
@@ -62,25 +79,41 @@ class StopWatch(object):
     @property
     def total_split_time(self):
         if self.is_started:
-            return self._total_split_time
+            if self._total_split_ns is None:
+                return None
+            return _ns_to_timedelta(self._total_split_ns)
         else:
             return timedelta(0)
 
     @property
     def mean_split_time(self):
-        """Return mean split time in microseconds."""
-        if self.is_started and self._total_split_time is not None:
-            return self._total_split_time / self._splits_count
+        if self.is_started and self._total_split_ns is not None:
+            return _ns_to_timedelta(self._total_split_ns // self._splits_count)
         else:
             return timedelta(0)
 
+    @property
+    def mean_split_time_in_ms(self):
+        """Return the mean split time as a float number of milliseconds."""
+        if self.is_started and self._total_split_ns is not None:
+            return self._total_split_ns / self._splits_count / 1000000
+        else:
+            return 0.0
+
+    @property
+    def last_split_ns(self):
+        """Return the last split time in nanoseconds."""
+        return self._last_split_ns
+
     @property
     def last_split_time(self):
-        return self._last_split_time
+        if self._last_split_ns is None:
+            return None
+        return _ns_to_timedelta(self._last_split_ns)
 
     @property
     def total_time(self):
         if self.is_started:
-            return datetime.utcnow() - self._started_at
+            return _ns_to_timedelta(time.perf_counter_ns() - self._started_ns)
         else:
             return timedelta(0)
@@ -15,34 +15,59 @@ ANSI_PREFIX_CHAR = '\x1b'
 
 ANSI_ESCAPE_PATTERN = r'{}.*?m'.format(ANSI_PREFIX_CHAR)
 
+ANSI_ESCAPE_RE = re.compile(ANSI_ESCAPE_PATTERN)
+
 def strip_ansi_escape(string):
-    return re.subn(ANSI_ESCAPE_PATTERN, "", string)[0]
+    if ANSI_PREFIX_CHAR not in string:
+        return string
+    return ANSI_ESCAPE_RE.sub("", string)
 
-def ansi_string_truncinfo(string, size):
+def _check_truncate_args(string, size):
     if size < 0:
         raise ValueError("size must be positive")
     if string is None:
         raise ValueError("expected a string, not {!r}"
                          .format(type(string).__name__))
+
+def ansi_string_truncinfo(string, size):
+    _check_truncate_args(string, size)
+    if ANSI_PREFIX_CHAR not in string:
+        length = min(size, len(string))
+        return (length, length, False)
     cl = 0 # cumulative number of character visited so far
     al = 0 # cumulative number of ansi escape character visited so far
     last_end = 0
     has_ansi = False
-    for mo in re.finditer(ANSI_ESCAPE_PATTERN, string):
-        # print("MO", repr(mo), len(mo.group(0).encode()))
-        cl += mo.start() - last_end
+    i = 0
+    while True:
+        start = string.find(ANSI_PREFIX_CHAR, i)
+        if start < 0:
+            break
+        end = string.find("m", start+1)
+        if end < 0:
+            break
+        # Like ANSI_ESCAPE_PATTERN, an escape sequence cannot span lines.
+        nl = string.find("\n", start+1, end)
+        if nl >= 0:
+            i = nl + 1
+            continue
+        end += 1
+        cl += start - last_end
         if cl >= size:
             break
-        al += mo.end() - mo.start()
-        last_end = mo.end()
+        al += end - start
+        last_end = end
         has_ansi = True
-        # print("cl", cl, "al", al)
+        i = end
     cl += len(string) - last_end
     # print("last cl", cl)
     length = min(size, cl)
     return (al+length, length, has_ansi)
 
 def truncate_ansi_string(string, size):
+    _check_truncate_args(string, size)
+    if ANSI_PREFIX_CHAR not in string:
+        return string[:size]
     string_pos, visual_pos, isansi = ansi_string_truncinfo(string, size)
     return string[:string_pos]
 
@@ -56,13 +81,15 @@ def fore_color_name(name):
 def back_color_name(name):
     return "back_" + name
 
-def isatty_term(self, stream=sys.stdout):
+def isatty_term(stream=sys.stdout):
     try:
         fileno = stream.fileno()
     except:
         return False
     else:
-        return os.isatty(fileno) and os.environ["TERM"] != "dumb"
+        # Without TERM we cannot know how to control the terminal.
+        return os.isatty(fileno) \
+            and os.environ.get("TERM", "dumb") != "dumb"
 
 class TermInfo(object):
 
@@ -74,6 +101,7 @@ class TermInfo(object):
             self._set_back_color(cname, '')
         self.ansi_prefix_char = None
         ### Get capabilities
+        self._curses = self._load_curses()
         self.isatty = isatty_term(term_stream)
         # int capa
         for attr, capa, default in (("max_colors", "colors", None),
@@ -100,17 +128,22 @@ class TermInfo(object):
             self._init_hardcoded_colors()
         else:
             raise ValueError("invalid color mode: {}".format(color_mode))
+        # Terminals using ANSI color sequences understand the ANSI erase in
+        # line sequence too, which is cheaper than padding with spaces.
+        if not self.clear_eol and self.ansi_prefix_char == ANSI_PREFIX_CHAR:
+            self.clear_eol = ANSI_PREFIX_CHAR + "[K"
+
+    @staticmethod
+    def _load_curses():
+        # 'curses' module is not always available.
+        try:
+            import curses
+            curses.setupterm()
+        except Exception:
+            return None
+        return curses
 
     def _get_curses(self):
-        if not hasattr(self, "_curses"):
-            # 'curses' module is not always available.
-            try:
-                import curses
-                curses.setupterm()
-            except Exception:
-                self._curses = None
-            else:
-                self._curses = curses
         return self._curses
 
     def _setintcapa(self, attr, capa, default):
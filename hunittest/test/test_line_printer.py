@@ -0,0 +1,191 @@
+# -*- encoding: utf-8 -*-
+"""Test 'hunittest.line_printer' module.
+"""
+
+
+import unittest
+from unittest import mock
+import os
+import signal
+
+from hunittest.line_printer import LinePrinter
+from hunittest.line_printer import _TERMWIDTH_TTL
+
+
+class FakeClock(object):
+    """Stand-in for the 'time' module controlled by the tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def monotonic(self):
+        return self.now
+
+class FakeTermInfo(object):
+    """Terminal capabilities independent of the terminal running the tests."""
+
+    def __init__(self, columns=20, clear_eol="\x1b[K"):
+        self.columns = columns
+        self.carriage_return = "\r"
+        self.clear_eol = clear_eol
+        self.reset_all = "\x1b[0m"
+        self.show_cursor = ""
+        self.hide_cursor = ""
+
+class PipeLinePrinterTestCase(unittest.TestCase):
+    """Run a line printer, pretending to be on a terminal, over a pipe."""
+
+    def setUp(self):
+        super(PipeLinePrinterTestCase, self).setUp()
+        rfd, wfd = os.pipe()
+        self.reader = open(rfd, "rb", buffering=0)
+        self.addCleanup(self.reader.close)
+        os.set_blocking(rfd, False)
+        self.output = open(wfd, "w", encoding="utf-8")
+        self.addCleanup(self.output.close)
+
+    def make_printer(self, **kwargs):
+        printer = LinePrinter(output=self.output, isatty=True)
+        printer._termnfo = FakeTermInfo(**kwargs)
+        return printer
+
+    def read_output(self):
+        self.output.flush()
+        return self.reader.read() or b""
+
+class TestTermWidth(PipeLinePrinterTestCase):
+
+    def setUp(self):
+        super(TestTermWidth, self).setUp()
+        self.clock = FakeClock()
+        patcher = mock.patch("hunittest.line_printer.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.printer = self.make_printer()
+        patcher = mock.patch.object(self.printer, "_query_termwidth",
+                                    side_effect=[80, 100, 120])
+        self.query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fallback_on_term_info(self):
+        # A pipe has no terminal size.
+        self.assertEqual(20, LinePrinter._query_termwidth(self.printer))
+
+    def test_cached_until_ttl(self):
+        self.assertEqual(80, self.printer._get_termwidth())
+        self.clock.sleep(_TERMWIDTH_TTL / 2)
+        self.assertEqual(80, self.printer._get_termwidth())
+        self.assertEqual(1, self.query.call_count)
+        self.clock.sleep(_TERMWIDTH_TTL / 2)
+        self.assertEqual(100, self.printer._get_termwidth())
+        self.assertEqual(2, self.query.call_count)
+
+    @unittest.skipUnless(hasattr(signal, "SIGWINCH"), "requires SIGWINCH")
+    def test_sigwinch_invalidates(self):
+        prev_handler = signal.getsignal(signal.SIGWINCH)
+        with mock.patch.object(signal, "siginterrupt",
+                               wraps=signal.siginterrupt) as siginterrupt:
+            with self.printer:
+                siginterrupt.assert_called_once_with(signal.SIGWINCH, False)
+                self.assertEqual(80, self.printer._get_termwidth())
+                # The cache does not expire while we get notified.
+                self.clock.sleep(_TERMWIDTH_TTL * 2)
+                self.assertEqual(80, self.printer._get_termwidth())
+                self.assertEqual(1, self.query.call_count)
+                os.kill(os.getpid(), signal.SIGWINCH)
+                self.assertEqual(100, self.printer._get_termwidth())
+                self.assertEqual(2, self.query.call_count)
+        self.assertEqual(prev_handler, signal.getsignal(signal.SIGWINCH))
+        # Back to the time-to-live policy.
+        self.clock.sleep(_TERMWIDTH_TTL)
+        self.assertEqual(120, self.printer._get_termwidth())
+
+class TestOverwrite(PipeLinePrinterTestCase):
+
+    def test_plain_line(self):
+        printer = self.make_printer()
+        printer.overwrite("foo")
+        self.assertEqual(b"\rfoo", self.read_output())
+        printer.overwrite("barbaz")
+        self.assertEqual(b"\rbarbaz\x1b[K", self.read_output())
+
+    def test_truncate_long_line(self):
+        printer = self.make_printer(columns=5)
+        printer.overwrite("0123456789")
+        self.assertEqual(b"\r01234", self.read_output())
+
+    def test_ansi_line(self):
+        printer = self.make_printer(columns=5)
+        printer.overwrite("\x1b[31mab\x1b[0mcdefg")
+        self.assertEqual(b"\r\x1b[31mab\x1b[0mcde", self.read_output())
+
+    def test_pad_shorter_line_without_clear_eol(self):
+        printer = self.make_printer(clear_eol="")
+        printer.overwrite("foobar")
+        printer.overwrite("foo")
+        self.assertEqual(b"\rfoobar\rfoo   ", self.read_output())
+        printer.overwrite("\x1b[31mf\x1b[0m")
+        self.assertEqual(b"\r\x1b[31mf\x1b[0m\x1b[0m  ", self.read_output())
+
+    def test_same_line_is_not_rewritten(self):
+        printer = self.make_printer()
+        with mock.patch("hunittest.line_printer.os.write",
+                        wraps=os.write) as write:
+            printer.overwrite("foo")
+            printer.overwrite("foo")
+            self.assertEqual(1, write.call_count)
+        self.assertEqual(b"\rfoo", self.read_output())
+
+    def test_same_line_after_new_line(self):
+        printer = self.make_printer()
+        printer.overwrite("foo")
+        printer.write_nl("bar")
+        printer.overwrite("foo")
+        self.assertEqual(b"\rfoobar\n\rfoo", self.read_output())
+        printer.overwrite_nl("foo")
+        printer.overwrite("foo")
+        self.assertEqual(b"\n\rfoo", self.read_output())
+
+    def test_single_write_per_line(self):
+        printer = self.make_printer()
+        with mock.patch("hunittest.line_printer.os.write",
+                        wraps=os.write) as write:
+            printer.overwrite("foo")
+            printer.overwrite("barbaz")
+            self.assertEqual(2, write.call_count)
+
+    def test_flush_text_layer_before_raw_write(self):
+        printer = self.make_printer()
+        printer.write("abc")
+        printer.overwrite("foo")
+        self.assertEqual(b"abc\rfoo", self.read_output())
+
+    def test_partial_raw_write(self):
+        os_write = os.write
+        def write_at_most_2_bytes(fd, data):
+            return os_write(fd, data[:2])
+        printer = self.make_printer()
+        with mock.patch("hunittest.line_printer.os.write",
+                        side_effect=write_at_most_2_bytes) as write:
+            printer.overwrite("été")
+            # 6 bytes once encoded.
+            self.assertEqual(3, write.call_count)
+        self.assertEqual("\rété".encode("utf-8"), self.read_output())
+
+    def test_non_utf8_output_uses_text_layer(self):
+        self.output.reconfigure(encoding="latin-1")
+        printer = self.make_printer()
+        with mock.patch("hunittest.line_printer.os.write") as write:
+            printer.overwrite("été")
+            write.assert_not_called()
+        self.assertEqual("\rété".encode("latin-1"), self.read_output())
+
+    def test_not_a_tty(self):
+        printer = LinePrinter(output=self.output, isatty=False)
+        printer.overwrite("foo")
+        printer.overwrite("foo")
+        printer.overwrite("bar")
+        self.assertEqual(b"foo\nbar\n", self.read_output())
@@ -0,0 +1,117 @@
+# -*- encoding: utf-8 -*-
+"""Test 'hunittest.runner' module.
+"""
+
+
+import unittest
+import os
+import io
+from contextlib import redirect_stdout
+
+from hunittest.runner import run_concurrent_tests
+from hunittest.unittestresultlib import Status
+
+
+def kill_worker():
+    """Loaded as a test by the worker, which dies without reporting it."""
+    os._exit(3)
+
+KILL_WORKER = __name__ + ".kill_worker"
+
+# Resolving it raises in the worker, which reports the error and exits.
+BROKEN_TEST = "os.sep"
+
+PASSING_TESTS = [
+    "hunittest.test.test_collectlib.TestIsPkg." + name
+    for name in ("test_package", "test_module", "test_class",
+                 "test_method", "test_function")
+] + [
+    "hunittest.test.test_timedeltalib.TestTimeUnit." + name
+    for name in ("test_sanity", "test_as_timeunit", "test_timedelta_to_unit")
+]
+
+# Each of them takes a quarter of second.
+SLOW_TESTS = [
+    "hunittest.test_samples.testsamp_allgood.Case1." + name
+    for name in ("test_success", "test_success1", "test_success2")
+]
+
+class RecordingResult(object):
+    """Record what run_concurrent_tests() reports."""
+
+    shouldStop = False
+
+    def __init__(self, failfast=False):
+        self.failfast = failfast
+        self.started = []
+        self.statuses = {}
+        # Tests whose result was processed without being started first.
+        self.not_started = []
+
+    def startTest(self, test_name):
+        self.started.append(test_name)
+
+    def process_result(self, result_msg):
+        test_name = result_msg.test_name
+        if test_name not in self.started or test_name in self.statuses:
+            self.not_started.append(test_name)
+        statuses = [r.status for r in result_msg.results]
+        self.statuses[test_name] = statuses
+        if self.failfast and any(s.is_erroneous() for s in statuses):
+            self.shouldStop = True
+
+class TestRunConcurrentTests(unittest.TestCase):
+
+    def run_tests(self, test_names, njobs, chunk_size, failfast=False):
+        result = RecordingResult(failfast=failfast)
+        with redirect_stdout(io.StringIO()) as stdout:
+            run_concurrent_tests(test_names, result, njobs=njobs,
+                                 worker_kwargs={}, chunk_size=chunk_size)
+        return result, stdout.getvalue()
+
+    def assertAllReported(self, result, test_names, failing_test_names):
+        expected = {
+            test_name: [Status.ERROR if test_name in failing_test_names
+                        else Status.PASS]
+            for test_name in test_names
+        }
+        self.assertEqual(expected, result.statuses)
+        self.assertEqual(sorted(test_names), sorted(result.started))
+        self.assertEqual([], result.not_started)
+
+    def test_all_pass(self):
+        result, _ = self.run_tests(PASSING_TESTS, njobs=2, chunk_size=3)
+        self.assertAllReported(result, PASSING_TESTS, ())
+
+    def test_worker_dies_in_the_middle_of_a_chunk(self):
+        # The first worker dies on the second test of its chunk. The other
+        # one runs the rest of the chunk once done with its own.
+        test_names = list(PASSING_TESTS)
+        test_names.insert(1, KILL_WORKER)
+        result, _ = self.run_tests(test_names, njobs=2, chunk_size=4)
+        self.assertAllReported(result, test_names, (KILL_WORKER,))
+
+    def test_worker_error_in_the_middle_of_a_chunk(self):
+        test_names = list(PASSING_TESTS)
+        test_names.insert(1, BROKEN_TEST)
+        result, stdout = self.run_tests(test_names, njobs=2, chunk_size=4)
+        self.assertAllReported(result, test_names, (BROKEN_TEST,))
+        self.assertIn("[worker0]", stdout)
+
+    def test_no_worker_left(self):
+        # The tests left in the chunk of the dead worker, as well as the
+        # ones never sent, are reported as errors.
+        test_names = [PASSING_TESTS[0], KILL_WORKER] + PASSING_TESTS[1:]
+        result, _ = self.run_tests(test_names, njobs=1, chunk_size=4)
+        self.assertAllReported(result, test_names, test_names[1:])
+
+    def test_stop_in_the_middle_of_a_chunk(self):
+        # The second worker is still running its chunk when the first one
+        # dies and the run stops.
+        test_names = [KILL_WORKER] + PASSING_TESTS[:3] + SLOW_TESTS
+        result, _ = self.run_tests(test_names, njobs=2, chunk_size=4,
+                                   failfast=True)
+        self.assertTrue(result.shouldStop)
+        self.assertEqual([Status.ERROR], result.statuses[KILL_WORKER])
+        self.assertLess(len(result.statuses), len(test_names))
+        self.assertEqual([], result.not_started)
@@ -4,16 +4,32 @@
 
 
 import unittest
-import time
+from unittest import mock
 from datetime import timedelta
 
 from hunittest.stopwatch import StopWatch
 
 
+class FakeClock(object):
+    """Stand-in for the 'time' module controlled by the tests."""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def sleep(self, seconds):
+        self.now_ns += int(seconds * 1e9)
+
+    def perf_counter_ns(self):
+        return self.now_ns
+
 class TestStopWatch(unittest.TestCase):
 
-    def assertTimedeltaAlmostEqual(self, td1, td2, prec=1e-3):
-        return abs(td1 - td2).total_seconds <= prec
+    def setUp(self):
+        super(TestStopWatch, self).setUp()
+        self.clock = FakeClock()
+        patcher = mock.patch("hunittest.stopwatch.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_is_started(self):
         sw = StopWatch()
@@ -28,38 +44,29 @@ class TestStopWatch(unittest.TestCase):
         sw.start()
         self.assertEqual(0, sw.splits_count)
         ### split 1
-        delay1 = 0.5
-        time.sleep(delay1)
+        self.clock.sleep(0.5)
         sw.split()
         self.assertEqual(1, sw.splits_count)
-        self.assertAlmostEqual(delay1,
-                               sw.last_split_time.total_seconds(),
-                               places=1)
-        self.assertAlmostEqual(delay1,
-                               sw.mean_split_time.total_seconds(),
-                               places=1)
+        self.assertEqual(500000000, sw.last_split_ns)
+        self.assertEqual(timedelta(seconds=0.5), sw.last_split_time)
+        self.assertEqual(timedelta(seconds=0.5), sw.mean_split_time)
+        self.assertEqual(500.0, sw.mean_split_time_in_ms)
         self.assertEqual(sw.last_split_time, sw.total_split_time)
-        ### split 1
-        delay2 = 1.0
-        time.sleep(delay2)
+        ### split 2
+        self.clock.sleep(1.0)
         sw.split()
         self.assertEqual(2, sw.splits_count)
-        self.assertAlmostEqual(delay2,
-                               sw.last_split_time.total_seconds(),
-                               places=1)
-        self.assertAlmostEqual((delay1 + delay2) / 2,
-                               sw.mean_split_time.total_seconds(),
-                               places=1)
-        self.assertAlmostEqual(delay1 + delay2,
-                               sw.total_split_time.total_seconds(),
-                               places=1)
+        self.assertEqual(1000000000, sw.last_split_ns)
+        self.assertEqual(timedelta(seconds=1.0), sw.last_split_time)
+        self.assertEqual(timedelta(seconds=0.75), sw.mean_split_time)
+        self.assertEqual(750.0, sw.mean_split_time_in_ms)
+        self.assertEqual(timedelta(seconds=1.5), sw.total_split_time)
 
     def test_total_time(self):
         sw = StopWatch()
         sw.start()
-        delay = 0.5
-        time.sleep(delay)
-        self.assertAlmostEqual(delay, sw.total_time.total_seconds(), places=1)
+        self.clock.sleep(0.5)
+        self.assertEqual(timedelta(seconds=0.5), sw.total_time)
 
     def test_split_raises_if_not_started(self):
         sw = StopWatch()
@@ -77,6 +84,7 @@ class TestStopWatch(unittest.TestCase):
 
     def test_mean_split_time_is_zero_when_not_started(self):
         self.assertEqual(timedelta(0), StopWatch().mean_split_time)
+        self.assertEqual(0.0, StopWatch().mean_split_time_in_ms)
 
     def test_total_time_is_zero_when_not_started(self):
         self.assertEqual(timedelta(0), StopWatch().total_time)
@@ -3,17 +3,35 @@
 """
 
 import unittest
+from unittest import mock
+import os
+import io
 
 from hunittest.termlib import truncate_ansi_string
 from hunittest.termlib import ansi_string_truncinfo
 from hunittest.termlib import TermInfo
+from hunittest.termlib import isatty_term
 
 
 class TestTruncateAnsiString(unittest.TestCase):
 
-    def setUp(self):
-        super(TestTruncateAnsiString, self).setUp()
-        self.termnfo = TermInfo(color_mode="always")
+    @classmethod
+    def setUpClass(cls):
+        super(TestTruncateAnsiString, cls).setUpClass()
+        # Building a TermInfo sets up the terminal; do it only once.
+        cls.termnfo = TermInfo(color_mode="always")
+        t = cls.termnfo
+        colors = dict(green=t.fore_green, red=t.fore_red,
+                      magenta=t.fore_magenta, blue=t.fore_blue,
+                      yellow=t.fore_yellow, cyan=t.fore_cyan,
+                      reset=t.reset_all)
+        prefix = "[ 50%|253.71|{green}2{reset}|{red}0{reset}" \
+                 "|{magenta}0{reset}|{blue}0{reset}|{yellow}0{reset}" \
+                 "|{cyan}0{reset}]" \
+                 "{green} SUCCESS {reset}: testtest.test_".format(**colors)
+        cls.USE_CASE_FIXTURE = prefix \
+            + "allgood.Case1.test_success2 (0:00:00.252080)"
+        cls.USE_CASE_EXPECTED = prefix
 
     def test_negative(self):
         with self.assertRaises(ValueError):
@@ -35,309 +53,88 @@ class TestTruncateAnsiString(unittest.TestCase):
         self.assertEqual("", truncate_ansi_string("", 1))
         self.assertEqual("", truncate_ansi_string("", 100))
 
-    def test_size_0_no_ansi(self):
-        q = "foobarblue"
-        a = ""
-        s = 0
-        self.assertEqual(a, truncate_ansi_string(q, s))
-        self.assertEqual((s, s, False),
-                         ansi_string_truncinfo(q, s))
-
-    def test_size_1_no_ansi(self):
-        q = "foobarblue"
-        s = 1
-        a = "f"
-        self.assertEqual(a, truncate_ansi_string(q, s))
-        self.assertEqual((s, s, False),
-                         ansi_string_truncinfo(q, s))
-
-    def test_size_3_no_ansi(self):
-        q = "foobarblue"
-        a = "foo"
-        s = 3
-        self.assertEqual(a, truncate_ansi_string(q, s))
-        self.assertEqual((s, s, False),
-                         ansi_string_truncinfo(q, s))
-
-    def test_size_exceed_no_ansi(self):
-        text = "foobarblue"
-        s = 10000
-        self.assertEqual(text, truncate_ansi_string(text, s))
-        self.assertEqual((len(text), len(text), False),
-                         ansi_string_truncinfo(text, s))
-
-    def test_size_0_ansi_first(self):
-        fixture = self.termnfo.fore_red+"text"
-        size = 0
-        expected = ""
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((0, 0, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_1_ansi_first(self):
-        fixture = self.termnfo.fore_red+"text"
-        size = 1
-        expected = self.termnfo.fore_red+"t"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), 1, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_2_ansi_first(self):
-        fixture = self.termnfo.fore_red+"text"
-        size = 2
-        expected = self.termnfo.fore_red+"te"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_3_ansi_first(self):
-        fixture = self.termnfo.fore_red+"text"
-        size = 3
-        expected = self.termnfo.fore_red+"tex"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_exceed_ansi_first(self):
-        fixture = self.termnfo.fore_red+"text"
-        expected = self.termnfo.fore_red+"text"
-        actual = truncate_ansi_string(fixture, 4000)
-        self.assertEqual(expected, actual)
-
-    def test_size_0_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"red"
-        size = 0
-        expected = ""
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_1_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"red"
-        size = 1
-        expected = "1"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_2_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"red"
-        size = 2
-        expected = "12"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_3_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"red"
-        size = 3
-        expected = "123"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_4_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"456"
-        size = 4
-        expected = "123"+self.termnfo.fore_red+"4"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_5_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"456"
-        size = 5
-        expected = "123"+self.termnfo.fore_red+"45"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_6_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"456"
-        size = 6
-        expected = "123"+self.termnfo.fore_red+"456"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_exceed_ansi_middle(self):
-        fixture = "123"+self.termnfo.fore_red+"456"
-        size = 10000
-        expected = "123"+self.termnfo.fore_red+"456"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), 6, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_0_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"
-        size = 0
-        expected = ""
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_1_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"
-        size = 1
-        expected = self.termnfo.fore_blue+"1"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_2_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"
-        size = 2
-        expected = self.termnfo.fore_blue+"12"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_3_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"
-        size = 3
-        expected = self.termnfo.fore_blue+"123"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_4_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        size = 4
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"4"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_5_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        size = 5
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"45"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_6_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        size = 6
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_exceed_ansi_first_middle(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        size = 1000
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), 6, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_0_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"+self.termnfo.fore_green
-        size = 0
-        expected = ""
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, False),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_1_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"+self.termnfo.fore_green
-        size = 1
-        expected = self.termnfo.fore_blue+"1"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_2_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"+self.termnfo.fore_green
-        size = 2
-        expected = self.termnfo.fore_blue+"12"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_3_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"red"+self.termnfo.fore_green
-        size = 3
-        expected = self.termnfo.fore_blue+"123"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_4_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        size = 4
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"4"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_5_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        size = 5
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"45"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_6_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        size = 6
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_7_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        size = 7
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), 6, True),
-                         ansi_string_truncinfo(fixture, size))
-
-    def test_size_exceed_ansi_first_middle_last(self):
-        fixture = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        size = 1000
-        expected = self.termnfo.fore_blue+"123"+self.termnfo.fore_red+"456"+self.termnfo.fore_green
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), 6, True),
-                         ansi_string_truncinfo(fixture, size))
+    # (fixture, size, expected, expected visual length, expected has ansi)
+    # Colors are written as format fields and replaced by their escape code.
+    TRUNCATE_CASES = [
+        ("foobarblue", 0, "", 0, False),
+        ("foobarblue", 1, "f", 1, False),
+        ("foobarblue", 3, "foo", 3, False),
+        ("foobarblue", 10000, "foobarblue", 10, False),
+        ("{red}text", 0, "", 0, False),
+        ("{red}text", 1, "{red}t", 1, True),
+        ("{red}text", 2, "{red}te", 2, True),
+        ("{red}text", 3, "{red}tex", 3, True),
+        ("{red}text", 4000, "{red}text", 4, True),
+        ("123{red}red", 0, "", 0, False),
+        ("123{red}red", 1, "1", 1, False),
+        ("123{red}red", 2, "12", 2, False),
+        ("123{red}red", 3, "123", 3, False),
+        ("123{red}456", 4, "123{red}4", 4, True),
+        ("123{red}456", 5, "123{red}45", 5, True),
+        ("123{red}456", 6, "123{red}456", 6, True),
+        ("123{red}456", 10000, "123{red}456", 6, True),
+        ("{blue}123{red}red", 0, "", 0, False),
+        ("{blue}123{red}red", 1, "{blue}1", 1, True),
+        ("{blue}123{red}red", 2, "{blue}12", 2, True),
+        ("{blue}123{red}red", 3, "{blue}123", 3, True),
+        ("{blue}123{red}456", 4, "{blue}123{red}4", 4, True),
+        ("{blue}123{red}456", 5, "{blue}123{red}45", 5, True),
+        ("{blue}123{red}456", 6, "{blue}123{red}456", 6, True),
+        ("{blue}123{red}456", 1000, "{blue}123{red}456", 6, True),
+        ("{blue}123{red}red{green}", 0, "", 0, False),
+        ("{blue}123{red}red{green}", 1, "{blue}1", 1, True),
+        ("{blue}123{red}red{green}", 2, "{blue}12", 2, True),
+        ("{blue}123{red}red{green}", 3, "{blue}123", 3, True),
+        ("{blue}123{red}456{green}", 4, "{blue}123{red}4", 4, True),
+        ("{blue}123{red}456{green}", 5, "{blue}123{red}45", 5, True),
+        ("{blue}123{red}456{green}", 6, "{blue}123{red}456", 6, True),
+        ("{blue}123{red}456{green}", 7, "{blue}123{red}456{green}", 6, True),
+        ("{blue}123{red}456{green}", 1000, "{blue}123{red}456{green}",
+         6, True),
+    ]
+
+    def _colorize(self, string):
+        return string.format(red=self.termnfo.fore_red,
+                             green=self.termnfo.fore_green,
+                             blue=self.termnfo.fore_blue)
+
+    def test_truncate(self):
+        for i, (fixture, size, expected, visual_len, has_ansi) \
+            in enumerate(self.TRUNCATE_CASES):
+            with self.subTest(i=i, fixture=fixture, size=size):
+                fixture = self._colorize(fixture)
+                expected = self._colorize(expected)
+                self.assertEqual(expected,
+                                 truncate_ansi_string(fixture, size))
+                self.assertEqual((len(expected), visual_len, has_ansi),
+                                 ansi_string_truncinfo(fixture, size))
 
     def test_use_case(self):
-        fixture = "[ 50%|253.71|"+self.termnfo.fore_green+"2"+self.termnfo.reset_all+"|"+self.termnfo.fore_red+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_magenta+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_blue+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_yellow+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_cyan+"0"+self.termnfo.reset_all+"]"+self.termnfo.fore_green+" SUCCESS "+self.termnfo.reset_all+": testtest.test_allgood.Case1.test_success2 (0:00:00.252080)"
         size = 50
-        expected = "[ 50%|253.71|"+self.termnfo.fore_green+"2"+self.termnfo.reset_all+"|"+self.termnfo.fore_red+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_magenta+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_blue+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_yellow+"0"+self.termnfo.reset_all+"|"+self.termnfo.fore_cyan+"0"+self.termnfo.reset_all+"]"+self.termnfo.fore_green+" SUCCESS "+self.termnfo.reset_all+": testtest.test_"
-        actual = truncate_ansi_string(fixture, size)
-        self.assertEqual(expected, actual)
-        self.assertEqual((len(expected), size, True),
-                         ansi_string_truncinfo(fixture, size))
+        self.assertEqual(self.USE_CASE_EXPECTED,
+                         truncate_ansi_string(self.USE_CASE_FIXTURE, size))
+        self.assertEqual((len(self.USE_CASE_EXPECTED), size, True),
+                         ansi_string_truncinfo(self.USE_CASE_FIXTURE, size))
+
+class TestIsattyTerm(unittest.TestCase):
+
+    def test_not_a_file(self):
+        self.assertFalse(isatty_term(io.StringIO()))
+
+    def test_pipe(self):
+        rfd, wfd = os.pipe()
+        os.close(rfd)
+        with open(wfd, "w") as stream:
+            self.assertFalse(isatty_term(stream))
+
+    @unittest.skipUnless(hasattr(os, "openpty"), "requires a pty")
+    def test_pty(self):
+        master_fd, slave_fd = os.openpty()
+        self.addCleanup(os.close, master_fd)
+        with open(slave_fd, "w") as stream:
+            for env, expected in (({"TERM": "xterm"}, True),
+                                  ({"TERM": "dumb"}, False),
+                                  ({}, False)):
+                with self.subTest(env=env), \
+                     mock.patch.dict(os.environ, env, clear=True):
+                    self.assertIs(expected, isatty_term(stream))
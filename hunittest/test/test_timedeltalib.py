@@ -5,10 +5,10 @@
 
 import unittest
 from datetime import timedelta
-import itertools
 import operator
 
 from hunittest.timedeltalib import timedelta_to_hstr
+from hunittest.timedeltalib import ns_to_hstr
 from hunittest.timedeltalib import TimeUnit
 from hunittest.timedeltalib import as_timeunit
 from hunittest.timedeltalib import timedelta_to_unit
@@ -42,6 +42,13 @@ class TestTimedeltaToHstr(unittest.TestCase):
             self.assertEqual(a, timedelta_to_hstr(q),
                              "wrong answer for {!r} for data {}".format(q, i))
 
+    def test_ns_to_hstr(self):
+        for td in (timedelta(0), timedelta(microseconds=1234),
+                   timedelta(seconds=61, microseconds=5),
+                   timedelta(weeks=1, hours=3)):
+            ns = td // timedelta(microseconds=1) * 1000 + 999
+            self.assertEqual(timedelta_to_hstr(td), ns_to_hstr(ns))
+
 class TestTimeUnit(unittest.TestCase):
 
     UNIT_NAMES = [
@@ -66,44 +73,30 @@ class TestTimeUnit(unittest.TestCase):
 
     ALL_UNITS = list(map(operator.itemgetter(1), UNIT_NAMES))
 
+    _ALL_STRING_PAIRS = UNIT_NAMES + UNIT_ABBREVS
+
     def test_sanity(self):
         self.assertEqual(len(TimeUnit), len(self.UNIT_NAMES))
         self.assertEqual(len(TimeUnit), len(self.UNIT_ABBREVS))
         self.assertEqual(len(TimeUnit), len(self.ALL_UNITS))
 
-    def test_name(self):
-        for i, (a, q) in enumerate(self.UNIT_NAMES):
-            self.assertEqual(a, q.name,
-                             "wrong answer for {!r} for data {}".format(q, i))
-
-    def test_abbrev(self):
-        for i, (a, q) in enumerate(self.UNIT_ABBREVS):
-            self.assertEqual(a, q.abbrev,
-                             "wrong answer for {!r} for data {}".format(q, i))
-
-    def test_from_name(self):
-        for i, (q, a) in enumerate(self.UNIT_NAMES):
-            self.assertEqual(a, TimeUnit.from_name(q),
-                             "wrong answer for {!r} for data {}".format(q, i))
-
-    def test_from_abbrev(self):
-        for i, (q, a) in enumerate(self.UNIT_ABBREVS):
-            self.assertEqual(a, TimeUnit.from_abbrev(q),
-                             "wrong answer for {!r} for data {}".format(q, i))
-
-    def test_from_string(self):
-        for i, (q, a) in enumerate(itertools.chain(self.UNIT_NAMES,
-                                                   self.UNIT_ABBREVS)):
-            self.assertIs(a, TimeUnit.from_string(q),
-                          "wrong answer for {!r} for data {}".format(q, i))
+    def test_units(self):
+        for name, unit in self.UNIT_NAMES:
+            with self.subTest(name=name):
+                self.assertEqual(name, unit.name)
+                self.assertIs(unit, TimeUnit.from_name(name))
+                self.assertIs(unit, TimeUnit.from_string(name))
+        for abbrev, unit in self.UNIT_ABBREVS:
+            with self.subTest(abbrev=abbrev):
+                self.assertEqual(abbrev, unit.abbrev)
+                self.assertIs(unit, TimeUnit.from_abbrev(abbrev))
+                self.assertIs(unit, TimeUnit.from_string(abbrev))
 
     def test_as_timeunit(self):
-        identity = zip(self.ALL_UNITS, self.ALL_UNITS)
-        iterator = itertools.chain(self.UNIT_NAMES,
-                                   self.UNIT_ABBREVS,
-                                   identity)
-        for i, (q, a) in enumerate(iterator):
-            self.assertIs(a, as_timeunit(a))
+        for q, a in self._ALL_STRING_PAIRS:
+            self.assertIs(a, as_timeunit(q))
+        for unit in self.ALL_UNITS:
+            self.assertIs(unit, as_timeunit(unit))
 
     def test_timedelta_to_unit(self):
         data = [
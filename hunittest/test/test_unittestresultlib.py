@@ -0,0 +1,108 @@
+# -*- encoding: utf-8 -*-
+"""Test 'hunittest.unittestresultlib' module.
+"""
+
+
+import unittest
+import pickle
+from datetime import timedelta
+from multiprocessing.reduction import ForkingPickler
+
+from hunittest.unittestresultlib import Status
+from hunittest.unittestresultlib import SubtestResult
+from hunittest.unittestresultlib import TestResultMsg
+from hunittest.unittestresultlib import pack_result_msg
+from hunittest.unittestresultlib import unpack_worker_msg
+from hunittest.unittestresultlib import _TRACEBACK_FILE_LINE_RE
+from hunittest.runner import _ErrMsg
+
+
+def make_result_msg(status=Status.PASS,
+                    total_time=timedelta(milliseconds=12),
+                    test_name="pkg.mod.Case.test_été",
+                    stdout="", stderr="", error=None, reason=None,
+                    params=None):
+    result = SubtestResult(status=status, error=error, reason=reason,
+                           params=params)
+    return TestResultMsg(stdout=stdout, stderr=stderr, test_name=test_name,
+                         total_time=total_time, results=[result])
+
+class TestWorkerMsg(unittest.TestCase):
+
+    def assertRoundTrip(self, worker_id, msg):
+        data = pack_result_msg(worker_id, msg)
+        self.assertIsNotNone(data)
+        self.assertEqual((worker_id, msg), unpack_worker_msg(data))
+
+    def test_every_status(self):
+        for status in Status:
+            with self.subTest(status=status):
+                self.assertRoundTrip(3, make_result_msg(status=status))
+
+    def test_total_time(self):
+        for total_time in (timedelta(0),
+                           timedelta(microseconds=-5),
+                           timedelta(days=-100000),
+                           timedelta(days=100000, microseconds=7)):
+            with self.subTest(total_time=total_time):
+                self.assertRoundTrip(
+                    0, make_result_msg(total_time=total_time))
+
+    def test_worker_id(self):
+        for worker_id in (0, 1, 0xffff):
+            with self.subTest(worker_id=worker_id):
+                self.assertRoundTrip(worker_id, make_result_msg())
+
+    def test_not_packed(self):
+        cases = [
+            (0, make_result_msg(total_time=timedelta.max)),
+            (0, make_result_msg(total_time=timedelta.min)),
+            (0, make_result_msg(total_time=None)),
+            (0x10000, make_result_msg()),
+            (0, make_result_msg(stdout="out")),
+            (0, make_result_msg(stderr="err")),
+            (0, make_result_msg(error=("ValueError", "msg", []))),
+            (0, make_result_msg(reason="skipped")),
+            (0, make_result_msg(params={"i": 1})),
+            (0, make_result_msg()._replace(results=[])),
+        ]
+        for i, (worker_id, msg) in enumerate(cases):
+            with self.subTest(i=i):
+                self.assertIsNone(pack_result_msg(worker_id, msg))
+
+    def test_pickled_msg(self):
+        # What the worker sends with Connection.send().
+        for obj in (make_result_msg(stdout="out"),
+                    _ErrMsg("ValueError", "Traceback...")):
+            with self.subTest(obj=obj):
+                data = bytes(ForkingPickler.dumps((1, obj)))
+                self.assertEqual((1, obj), unpack_worker_msg(data))
+
+    def test_marker_is_not_a_pickle_prefix(self):
+        obj = (1, _ErrMsg("ValueError", "Traceback..."))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                data = pickle.dumps(obj, protocol=protocol)
+                self.assertEqual(obj, unpack_worker_msg(data))
+
+class TestTracebackFileLineRe(unittest.TestCase):
+
+    def test_match(self):
+        data = [
+            ("/a/b.py", '  File "/a/b.py", line 12, in test_foo\n'
+                        '    self.fail()\n'),
+            ('/a/"b".py', '  File "/a/"b".py", line 1, in <module>'),
+            ("/a/b.py", '  File "/a/b.py", line 3, in f", line 4, in g'),
+        ]
+        for filename, lines in data:
+            with self.subTest(lines=lines):
+                mo = _TRACEBACK_FILE_LINE_RE.match(lines)
+                self.assertIsNotNone(mo)
+                self.assertEqual(filename, mo.group(1))
+
+    def test_no_match(self):
+        for lines in ("Traceback (most recent call last):\n",
+                      'File "/a/b.py", line 12, in test_foo',
+                      '  File "/a/b.py"'):
+            with self.subTest(lines=lines):
+                self.assertIsNone(_TRACEBACK_FILE_LINE_RE.match(lines))
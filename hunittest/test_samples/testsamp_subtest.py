@@ -4,6 +4,11 @@
 
 import unittest
 import time
+import os
+
+# Output captured from sub-tests is only printed on demand. Captured output
+# display is already covered by testsamp_simple.
+VERBOSE = bool(os.environ.get("HUNITTEST_SAMPLE_VERBOSE"))
 
 class NumbersTest(unittest.TestCase):
 
@@ -13,7 +18,8 @@ class NumbersTest(unittest.TestCase):
         """
         for i in range(0, 6):
             with self.subTest(i=i):
-                print("testing", i)
+                if VERBOSE:
+                    print("testing", i)
                 self.assertEqual(i % 2, 0)
 
     def test_even_error(self):
@@ -22,7 +28,8 @@ class NumbersTest(unittest.TestCase):
         """
         for i in range(0, 6):
             with self.subTest(i=i):
-                print("testing", i)
+                if VERBOSE:
+                    print("testing", i)
                 if i % 2 != 0:
                     raise RuntimeError("on purpose error for i={}".format(i))
 
@@ -32,7 +39,8 @@ class NumbersTest(unittest.TestCase):
         """
         for i in range(0, 6):
             with self.subTest(i=i):
-                print("testing", i)
+                if VERBOSE:
+                    print("testing", i)
                 if i % 2 == 0:
                     raise RuntimeError("on purpose error for i={}".format(i))
                 else:
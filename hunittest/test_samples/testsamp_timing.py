@@ -1,22 +1,31 @@
 # -*- encoding: utf-8 -*-
 """Sample test module for testing time measurement.
+
+Set HUNITTEST_SAMPLE_SLEEP_SCALE to scale the sleeping time (e.g. 0 to not
+sleep at all).
 """
 
 
 import unittest
 import time
+import os
+
+
+SLEEP_SCALE = float(os.environ.get("HUNITTEST_SAMPLE_SLEEP_SCALE", "1.0"))
 
+def sleep(seconds):
+    time.sleep(seconds * SLEEP_SCALE)
 
 class TestTime(unittest.TestCase):
 
     def test_one_sec(self):
-        time.sleep(1.0)
+        sleep(1.0)
 
     def test_half_sec(self):
-        time.sleep(0.5)
+        sleep(0.5)
 
     def test_three_sec(self):
-        time.sleep(3.0)
+        sleep(3.0)
 
     def test_one_and_half_sec(self):
-        time.sleep(1.5)
+        sleep(1.5)
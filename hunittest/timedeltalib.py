@@ -5,28 +5,23 @@
 
 from datetime import timedelta
 import enum
+import functools
 
-def has_decimal(v):
-    return (v - int(v)) != 0.0
-
-def strip_decimal(v):
-    if has_decimal(v):
-        return v
-    else:
-        return int(v)
-
+# There are only a few distinct combinations of arguments.
+@functools.lru_cache(maxsize=None)
 def significant_units(max_unit, precision=3):
+    """Return a tuple of the *precision* units from *max_unit* downward."""
     assert precision > 0
     found = False
     sign_units = []
-    for i, u in enumerate(reversed(TimeUnit)):
+    for u in _TIMEUNITS_DESC:
         if u is max_unit:
             found = True
         if found:
             sign_units.append(u)
             if len(sign_units) >= precision:
                 break
-    return sign_units
+    return tuple(sign_units)
 
 def timedelta_to_hstr(tdelta, precision=3):
     """A prettier string version of a timedelta.
@@ -38,23 +33,41 @@ def timedelta_to_hstr(tdelta, precision=3):
     the greatest one. For instance a result of '1m 2s 3ms 4us' will be printed
     like '1m 2s' with a precision of 2. None means all precision.
     """
+    # Decompose an integer number of microseconds rather than dividing
+    # timedeltas, which allocates a new timedelta for each remainder.
+    us = (tdelta.days * 86400 + tdelta.seconds) * 1000000 + tdelta.microseconds
+    return _us_to_hstr(us, precision)
+
+def ns_to_hstr(ns, precision=3):
+    """Like timedelta_to_hstr() but for a duration in nanoseconds."""
+    return _us_to_hstr(ns // 1000, precision)
+
+# Test durations tend to repeat, especially the short ones.
+@functools.lru_cache(maxsize=1024)
+def _us_to_hstr(us, precision):
+    if 0 <= us < 1000000:
+        # Fast path for sub-second durations, the common case for tests.
+        ms, us = divmod(us, 1000)
+        if not ms:
+            return "{:d}us".format(us)
+        if not us or precision < 2:
+            return "{:d}ms".format(ms)
+        return "{:d}ms {:d}us".format(ms, us)
     parts = []
-    units = []
-    r = tdelta
-    for u in reversed(TimeUnit):
-        q, r = divmod(r, u.value)
+    r = us
+    # Index of the first unit after the significant ones. The significant
+    # units are the 'precision' units following the greatest non-zero one.
+    end = len(_TIMEUNIT_US)
+    for i, value in enumerate(_TIMEUNIT_US):
+        if i >= end:
+            break
+        q, r = divmod(r, value)
         if q != 0:
-            parts.append("{:d}{}".format(q, u.abbrev))
-            units.append(u)
+            if not parts:
+                end = min(end, i + precision)
+            parts.append("{:d}{}".format(q, _TIMEUNIT_ABBREVS[i]))
     if parts:
-        assert len(units) == len(parts)
-        # Select only significant parts
-        sign_units = significant_units(units[0], precision)
-        sign_parts = []
-        for i in range(len(parts)):
-            if units[i] in sign_units:
-                sign_parts.append(parts[i])
-        return " ".join(sign_parts)
+        return " ".join(parts)
     else:
         return "0" + TimeUnit.microsecond.abbrev
 
@@ -79,21 +92,26 @@ class TimeUnit(enum.Enum):
 
     @classmethod
     def from_name(cls, name):
-        for s in cls:
-            if s.name == name:
-                return s
+        return _TIMEUNITS_BY_NAME.get(name)
 
     @classmethod
     def from_abbrev(cls, abbrev):
-        for s in cls:
-            if s.abbrev == abbrev:
-                return s
+        return _TIMEUNITS_BY_ABBREV.get(abbrev)
 
     @classmethod
     def from_string(cls, string):
-        for s in cls:
-            if s.name == string or s.abbrev == string:
-                return s
+        return _TIMEUNITS_BY_STRING.get(string)
+
+# Time units from the greatest to the smallest. Iterating over an enum
+# reversed is much slower than over a tuple.
+_TIMEUNITS_DESC = tuple(reversed(TimeUnit))
+_TIMEUNIT_US = tuple(u.value // TimeUnit.microsecond.value
+                     for u in _TIMEUNITS_DESC)
+_TIMEUNIT_ABBREVS = tuple(u.abbrev for u in _TIMEUNITS_DESC)
+
+_TIMEUNITS_BY_NAME = {u.name: u for u in TimeUnit}
+_TIMEUNITS_BY_ABBREV = {u.abbrev: u for u in TimeUnit}
+_TIMEUNITS_BY_STRING = dict(_TIMEUNITS_BY_NAME, **_TIMEUNITS_BY_ABBREV)
 
 def as_timeunit(obj):
     if isinstance(obj, TimeUnit):
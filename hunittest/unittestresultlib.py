@@ -11,25 +11,32 @@ import os
 import re
 import unittest
 import json
+import pickle
+import struct
 from enum import Enum
 from collections import namedtuple
 from datetime import timedelta
 import textwrap
 from fnmatch import fnmatch
 
-from hunittest.line_printer import strip_ansi_escape
+from hunittest.termlib import fore_color_name
 from hunittest.timedeltalib import timedelta_to_hstr as _timedelta_to_hstr
-from hunittest.timedeltalib import timedelta_to_unit
+from hunittest.timedeltalib import ns_to_hstr as _ns_to_hstr
 from hunittest.stopwatch import StopWatch
 from hunittest.utils import mkdir_p
 from hunittest.utils import safe_getcwd
-from hunittest.utils import issubdir
+from hunittest.utils import ensure_trailing_slash
 from hunittest import envar
 
 
 def timedelta_to_hstr(tdelta):
     return _timedelta_to_hstr(tdelta, precision=2)
 
+def ns_to_hstr(ns):
+    return _ns_to_hstr(ns, precision=2)
+
+_LOG_BUFFER_SIZE = 1 << 16
+
 class _LogLinePrinter(object):
     """Proxy over a LinePrinter.
 
@@ -43,7 +50,9 @@ class _LogLinePrinter(object):
         self._file = None
         if self._filename is not None:
             mkdir_p(os.path.dirname(filename))
-            self._file = open(filename, "w")
+            # A large buffer saves a system call per logged line.
+            self._file = open(filename, "w", buffering=_LOG_BUFFER_SIZE,
+                              encoding="utf-8")
 
     def close(self):
         if self._file is not None:
@@ -88,12 +97,29 @@ class _LogLinePrinter(object):
         self.write(msg)
         self._log(msg, False)
 
+    def log_write_lines(self, lines):
+        """Write and log all *lines* at once, each followed by a new line."""
+        if not lines:
+            return
+        msg = "\n".join(lines)
+        self.write_nl(msg, auto=False)
+        self._log(msg)
+
+    def flush_log(self):
+        if self._file is not None:
+            self._file.flush()
+
     def _log(self, msg, nl=True):
         if self._file is None:
             return
-        self._file.write(msg)
         if nl:
-            self._file.write("\n")
+            msg += "\n"
+        self._file.write(msg)
+
+@functools.lru_cache(maxsize=None)
+def _get_test_class_prefix(cls):
+    """Return the "pkg.mod.Class." prefix shared by all tests of *cls*."""
+    return cls.__module__ + "." + cls.__name__ + "."
 
 def get_test_name(test):
     """Return the full name of the given test object.
@@ -103,11 +129,7 @@ def get_test_name(test):
     # HTestResultServer may pass test name instead of test object.
     if isinstance(test, str):
         return test
-    return ".".join((
-        test.__module__,
-        type(test).__name__,
-        test._testMethodName,
-    ))
+    return _get_test_class_prefix(type(test)) + test._testMethodName
 
 class StatusDB:
     """A tiny DB to store status counters.
@@ -152,54 +174,69 @@ class Status(Enum):
 
     @classmethod
     def stopped(cls):
-        """Yield all status representing a stopped test."""
-        for status in cls:
-            if status is not cls.RUNNING and status is not cls.STOP:
-                yield status
+        """Return a tuple of all status representing a stopped test."""
+        return _STOPPED_STATUSES
 
     def is_erroneous(self):
         """Return whether this status is considered as an erroneous test status.
         """
         return self is self.FAIL or self is self.ERROR or self is self.XPASS
 
+# Computed once since it is iterated over for every progress line.
+_STOPPED_STATUSES = tuple(status for status in Status
+                          if status is not Status.RUNNING
+                          and status is not Status.STOP)
+
 class StatusCounters:
     """Hold test counters for each possible status.
     """
 
-    @staticmethod
-    def name(status):
-        return "{}_count".format(status.value)
-
     def __init__(self):
-        for status in Status.stopped():
-            self.set(status, 0)
+        self._counters = dict.fromkeys(Status.stopped(), 0)
 
     def get(self, status):
-        return getattr(self, self.name(status))
+        return self._counters[status]
 
     def set(self, status, value):
-        setattr(self, self.name(status), value)
+        self._counters[status] = value
 
     def inc(self, status, inc=1):
-        v = self.get(status)
-        self.set(status, v+inc)
+        self._counters[status] += inc
+
+    def values(self):
+        """Return a tuple of all counters in Status.stopped() order."""
+        return tuple(self._counters.values())
 
     def is_successful(self):
-        return self.fail_count \
-            == self.error_count \
-            == self.xpass_count \
+        counters = self._counters
+        return counters[Status.FAIL] \
+            == counters[Status.ERROR] \
+            == counters[Status.XPASS] \
             == 0
 
 def _format_exception(exc_type, exc_value, exc_traceback):
     """Own customization of traceback.format_exception().
 
-    When the result comes from another process the traceback is already
-    serialized thus we just have to return it.
+    Return an iterable over the formatted traceback entries. When the result
+    comes from another process the traceback is already serialized thus we
+    just have to return it.
     """
     # HTestResultServer passes serialized traceback.
     if isinstance(exc_traceback, list):
         return exc_traceback
-    return traceback.format_exception(exc_type, exc_value, exc_traceback)
+    return traceback.TracebackException(exc_type, exc_value,
+                                        exc_traceback).format()
+
+def _all_but_last(iterable):
+    """Yield all items of *iterable* except the last one."""
+    it = iter(iterable)
+    try:
+        prev = next(it)
+    except StopIteration:
+        return
+    for item in it:
+        yield prev
+        prev = item
 
 def _serialize_subtest_params(params):
     if not params:
@@ -226,45 +263,93 @@ class SummaryMode(Enum):
 def get_summary_mode_from_env():
     return SummaryMode.from_str(os.environ.get(envar.SUMMARY, "on_error"))
 
+# Name of the foreground color of each status.
+_STATUS_COLOR_NAMES = {
+    Status.PASS: "green",
+    Status.FAIL: "red",
+    Status.SKIP: "blue",
+    Status.XFAIL: "cyan",
+    Status.XPASS: "yellow",
+    Status.ERROR: "magenta",
+    Status.RUNNING: "white",
+    Status.STOP: "white",
+}
+
 class Color:
 
     def __init__(self, term_info):
-        self.STATUS_PASS = term_info.fore_green
-        self.STATUS_FAIL = term_info.fore_red
-        self.STATUS_SKIP = term_info.fore_blue
-        self.STATUS_XFAIL = term_info.fore_cyan
-        self.STATUS_XPASS = term_info.fore_yellow
-        self.STATUS_ERROR = term_info.fore_magenta
-        self.STATUS_RUNNING = term_info.fore_white
-        self.STATUS_STOP = term_info.fore_white
-        self.RESET = term_info.reset_all
-        self.TRACE_HL = term_info.fore_white \
-                        + term_info.bold
-        self.TEST_TRACE_HL = term_info.fore_white \
-                             + term_info.bold \
-                             + term_info.underline
+        self._status_colors = {}
+        for status, color_name in _STATUS_COLOR_NAMES.items():
+            color = getattr(term_info, fore_color_name(color_name))
+            # Also available as STATUS_PASS, STATUS_FAIL, etc...
+            setattr(self, "STATUS_" + status.name, color)
+            self._status_colors[status] = color
+        if term_info.color_enabled:
+            self.RESET = term_info.reset_all
+            self.TRACE_HL = term_info.fore_white \
+                            + term_info.bold
+            self.TEST_TRACE_HL = term_info.fore_white \
+                                 + term_info.bold \
+                                 + term_info.underline
+        else:
+            # Do not emit any escape sequence so that printed lines do not
+            # need to be scanned for them.
+            self.RESET = ""
+            self.TRACE_HL = ""
+            self.TEST_TRACE_HL = ""
 
     def status(self, status):
-        return getattr(self, "STATUS_{}".format(status.value.upper()))
+        return self._status_colors[status]
+
+# The non-greedy file name avoids backtracking over the rest of the line,
+# and still matches file names containing a quote.
+_TRACEBACK_FILE_LINE_RE = re.compile(
+    r'^\s+File "(.*?)", line \d+, in .*$', re.MULTILINE)
+
+# Slash terminated so that a plain startswith() tells whether a file is in it.
+_UNITTEST_DIR = ensure_trailing_slash(os.path.dirname(unittest.__file__))
 
 class ResultPrinter:
 
     _STATUS_MAXLEN = max(len(s.value) for s in Status)
 
+    # Arguments: progress, mean split time in ms, counters, test status.
+    _PROGRESS_PREFIX_FORMAT = "[{0:>4.0%}|{1:.2f}ms{2}] {3}: "
+
     def __init__(self, printer, top_level_directory, pattern,
                  log_filename=None,
                  strip_unittest_traceback=False,
                  show_progress=True):
         self._printer = _LogLinePrinter(printer, log_filename)
-        self._top_level_directory = top_level_directory
+        self._top_level_prefix = ensure_trailing_slash(top_level_directory)
         self._pattern = pattern
         self._strip_unittest_traceback=strip_unittest_traceback
-        self._show_progress = show_progress
+        # Do not bother formatting progress lines nobody will see.
+        self._show_progress = show_progress and not printer.quiet
         self._hbar_len = None
+        self._hbar = None
+        self._channel_headers = {}
+        # The last test object whose name was computed, and its name.
+        self._test_name_memo = (None, None)
         self._color = Color(self._printer.term_info)
+        # Counted status in display order along with the separator and
+        # color preceding their counter. Computed once since the progress
+        # line is printed for every test.
+        self._counter_prefixes = tuple(
+            (status, "|" + self._color.status(status))
+            for status in Status.stopped())
+        # The last counter values printed and their formatted segment.
+        self._counters_memo = (None, "")
+        # There are only a few possible formatted status.
+        self._formatted_statuses = {
+            (status, aligned): self._format_test_status(status, aligned)
+            for status in Status for aligned in (True, False)}
         self._summary_printer = SummaryPrinter(self._printer)
 
     def format_test_status(self, status, aligned=True):
+        return self._formatted_statuses[status, aligned]
+
+    def _format_test_status(self, status, aligned):
         msg = status.value.upper()
         if aligned:
             formatter = "{{:^{:d}}}".format(self._STATUS_MAXLEN)
@@ -276,190 +361,182 @@ class ResultPrinter:
 
     def _print_progress_message(self, test_name, test_status,
                                 status_counters, progress,
-                                mean_split_time, last_split_time,
+                                mean_split_time_in_ms, last_split_ns,
                                 params=None):
-        counters = {}
-        counters_format_parts = []
-        for status in Status.stopped():
-            counter_value = status_counters.get(status)
-            if counter_value > 0:
-                counters[status.value] = self._color.status(status) \
-                                         + str(counter_value) \
-                                         + self._color.RESET
-                counters_format_parts.append("{{{s}}}".format(s=status.value))
-        if counters_format_parts:
-            counter_format = "|" + "|".join(f for f in counters_format_parts)
-        else:
-            counter_format = ""
-        prefix_formatter = "[{progress:>4.0%}|{mean_split_time:.2f}ms" \
-                           + counter_format \
-                           + "] {test_status}: "
-        suffix_formatter = " ({elapsed})"
-        prefix = prefix_formatter.format(
-            progress=progress,
-            test_status=self.format_test_status(test_status),
-            mean_split_time=timedelta_to_unit(mean_split_time,
-                                              "ms"),
-            **counters)
+        # Counters do not change between a test outcome and the start of
+        # the next test so their segment is rebuilt only when they change.
+        counter_values = status_counters.values()
+        memo_values, counters = self._counters_memo
+        if counter_values != memo_values:
+            reset = self._color.RESET
+            counters = "".join(
+                counter_prefix + str(counter_value) + reset
+                for (_, counter_prefix), counter_value
+                in zip(self._counter_prefixes, counter_values)
+                if counter_value > 0)
+            self._counters_memo = (counter_values, counters)
+        prefix = self._PROGRESS_PREFIX_FORMAT.format(
+            progress, mean_split_time_in_ms, counters,
+            self.format_test_status(test_status))
         if test_status != Status.RUNNING \
-           and last_split_time is not None \
+           and last_split_ns is not None \
            and not params:
-            suffix = suffix_formatter.format(
-                elapsed=timedelta_to_hstr(last_split_time))
+            suffix = " (" + ns_to_hstr(last_split_ns) + ")"
         else:
             suffix = ""
         printed_test_name = test_name+_format_subtest_params(params)
         self._printer.overwrite_message(prefix, printed_test_name,
                                         suffix, ellipse_index=1)
 
+    def _get_test_name(self, test):
+        # The same test is usually printed several times in a row.
+        memo_test, memo_name = self._test_name_memo
+        if test is memo_test:
+            return memo_name
+        test_name = get_test_name(test)
+        self._test_name_memo = (test, test_name)
+        return test_name
+
     def reset(self):
         self._subtests_printed = False
         self._header_printed = False
 
     def print_message(self, test, test_status, status_counters, progress,
-                      mean_split_time, last_split_time,
+                      mean_split_time_in_ms, last_split_ns,
                       err=None, reason=None, params=None):
         if test_status is Status.RUNNING:
             self.reset()
-        test_name = get_test_name(test)
+        test_name = self._get_test_name(test)
         if self._show_progress:
             self._print_progress_message(test_name, test_status,
                                          status_counters, progress,
-                                         mean_split_time, last_split_time,
+                                         mean_split_time_in_ms,
+                                         last_split_ns,
                                          params=params)
         if err is not None:
-            self._print_error(test, test_status, err, params=params)
+            self._print_error(test_name, test_status, err, params=params)
         if reason is not None:
-            self._print_reason(test, test_status, reason)
+            self._print_reason(test_name, test_status, reason)
 
     def _extract_filename_from_error_line(self, line):
-        mo = re.match(r'^\s+File "(.*)", line \d+, in .*$', line,
-                      re.MULTILINE)
+        mo = _TRACEBACK_FILE_LINE_RE.match(line)
         if mo:
             return mo.group(1)
 
-    def _is_user_filename(self, line):
-        filename = self._extract_filename_from_error_line(line)
-        if filename is None:
-            return None
-        return issubdir(filename, self._top_level_directory)
-
-    def _is_user_test_filename(self, line):
-        filename = self._extract_filename_from_error_line(line)
-        if filename is None:
-            return None
-        return issubdir(filename, self._top_level_directory) \
-            and fnmatch(os.path.basename(filename), self._pattern)
-
-    def _is_unittest_filename(self, line):
-        filename = self._extract_filename_from_error_line(line)
-        if filename is None:
-            return None
-        return issubdir(filename, os.path.dirname(unittest.__file__))
-
     def _header_prefix(self, test_status):
         status = self.format_test_status(test_status, aligned=False)
         return "{status}: ".format(status=status)
 
-    def _print_header(self, test, test_status, params=None):
+    @staticmethod
+    def _header_prefix_len(test_status):
+        """Return the visual length of _header_prefix(*test_status*)."""
+        # Avoid scanning for escape sequences; only the status is colored.
+        return len(test_status.value) + 2
+
+    def _print_header(self, test_name, test_status, params=None):
         if self._header_printed:
             return
-        test_name = get_test_name(test)
-        msg = self._header_prefix(test_status) \
-              + "{name}".format(name=test_name)
-        self._hbar_len = len(strip_ansi_escape(msg))
-        self._printer.log_overwrite_nl("-" * self._hbar_len)
-        self._printer.log_write_nl(msg)
+        self._set_hbar_len(self._header_prefix_len(test_status)
+                           + len(test_name))
+        self._printer.log_overwrite_nl(self._hbar)
+        self._printer.log_write_nl(self._header_prefix(test_status)
+                                   + test_name)
         self._print_subtest_params(test_status, params, self._hbar_len)
         self._header_printed = not params
 
+    def _set_hbar_len(self, hbar_len):
+        if hbar_len == self._hbar_len:
+            return
+        self._hbar_len = hbar_len
+        self._hbar = "-" * hbar_len
+        self._channel_headers = {}
+
     def _print_subtest_params(self, test_status, params, width):
         if not params:
             return
-        prefix_len = len(strip_ansi_escape(self._header_prefix(test_status)))
+        prefix_len = self._header_prefix_len(test_status)
         for line in textwrap.wrap(_format_subtest_params(params),
                                   width=width - prefix_len):
             self._printer.log_write_nl("{}{}".format(" " * prefix_len, line))
         self._subtests_printed = True
 
-    def _print_error(self, test, test_status, err, params=None):
+    def _print_error(self, test_name, test_status, err, params=None):
         assert err is not None
         # Do not assert self._header_printed is False here, because this
         # method can be called multiple times per test (in case of error
         # raised from tearDown()).
-        self._print_header(test, test_status, params=params)
-        self._printer.log_write_nl("-" * self._hbar_len)
+        self._print_header(test_name, test_status, params=params)
+        out = [self._hbar]
         ### Print exception traceback
-        all_lines = _format_exception(*err)
-        for i in range(len(all_lines)-1):
-            lines = all_lines[i]
-            is_user_filename = self._is_user_filename(lines)
-            is_user_test_filename = self._is_user_test_filename(lines)
-            skip_next = False
-            for line in lines.splitlines():
-                leading_space = re.sub(r"^(\s*).*$", "\\1", line)
-                if skip_next:
-                    continue
-                if is_user_test_filename:
-                    formatted_line = leading_space + self._color.TEST_TRACE_HL \
-                                     + line.strip() + self._color.RESET
-                elif is_user_filename:
-                    formatted_line \
-                        = self._color.TRACE_HL + line + self._color.RESET
+        # The exception message is printed below.
+        # Each entry is either a frame, starting with its "File" line, or
+        # some text like the "Traceback" header.
+        for lines in _all_but_last(_format_exception(*err)):
+            filename = self._extract_filename_from_error_line(lines)
+            if filename is None:
+                out.extend(lines.splitlines())
+            elif filename.startswith(self._top_level_prefix):
+                if fnmatch(os.path.basename(filename), self._pattern):
+                    hl = self._color.TEST_TRACE_HL
+                    for line in lines.splitlines():
+                        stripped = line.strip()
+                        leading_space = line[:len(line)-len(line.lstrip())]
+                        out.append(leading_space + hl + stripped
+                                   + self._color.RESET)
                 else:
-                    if self._strip_unittest_traceback \
-                       and self._is_unittest_filename(line):
-                        skip_next = True
-                        formatted_line = None
-                    else:
-                        formatted_line = line
-                if formatted_line is not None:
-                    self._printer.log_write_nl(formatted_line)
+                    hl = self._color.TRACE_HL
+                    for line in lines.splitlines():
+                        out.append(hl + line + self._color.RESET)
+            elif self._strip_unittest_traceback \
+                 and filename.startswith(_UNITTEST_DIR):
+                continue
+            else:
+                out.extend(lines.splitlines())
         ### Print exception message
         err_lines = str(err[1]).splitlines()
+        exc_line = (self._color.status(test_status), err[0].__name__,
+                    self._color.RESET)
         if len(err_lines) == 0:
-            self._printer.log_write_nl(self._color.status(test_status) \
-                                       + err[0].__name__ \
-                                       + self._color.RESET)
+            out.append("".join(exc_line))
         else:
-            self._printer.log_write_nl(self._color.status(test_status) \
-                                       + err[0].__name__ \
-                                       + self._color.RESET \
-                                       + ": " \
-                                       + err_lines[0])
-            for i in range(1, len(err_lines)):
-                self._printer.log_write_nl(err_lines[i])
-
-    def _print_reason(self, test, test_status, reason):
+            out.append("".join(exc_line + (": ", err_lines[0])))
+            out.extend(err_lines[1:])
+        self._printer.log_write_lines(out)
+        # Make errors visible in the log even if we crash later.
+        self._printer.flush_log()
+
+    def _print_reason(self, test_name, test_status, reason):
         assert reason is not None
         msg = "{status}: {name}: {reason}"\
             .format(status=self.format_test_status(test_status, aligned=False),
-                    name=get_test_name(test),
+                    name=test_name,
                     reason=reason)
         self._printer.log_overwrite_nl(msg)
 
-    def _print_io(self, test, output, channel):
+    def _format_io(self, output, channel):
+        """Return the lines printing *output* captured from *channel*."""
         if not output:
-            return
+            return []
         assert self._hbar_len is not None
-        chanstr = " {} ".format(channel.upper())
-        start, rem = divmod(self._hbar_len - len(chanstr), 2)
-        msg = "-" * start
-        msg += chanstr
-        msg += "-" * (start + rem)
-        self._printer.log_write_nl(msg)
-        for line in output.splitlines():
-            self._printer.log_write_nl(line)
+        header = self._channel_headers.get(channel)
+        if header is None:
+            chanstr = " {} ".format(channel.upper())
+            start, rem = divmod(self._hbar_len - len(chanstr), 2)
+            header = "-" * start
+            header += chanstr
+            header += "-" * (start + rem)
+            self._channel_headers[channel] = header
+        return [header] + output.splitlines()
 
     def print_ios(self, test, stdout_value, stderr_value):
         if not stdout_value and not stderr_value:
             return
         status = Status.STOP if self._subtests_printed else Status.PASS
-        self._print_header(test, status)
-        self._print_io(test, stdout_value, "stdout")
-        self._print_io(test, stderr_value, "stderr")
-        if stdout_value or stderr_value:
-            self._printer.log_write_nl("-" * self._hbar_len)
+        self._print_header(self._get_test_name(test), status)
+        out = self._format_io(stdout_value, "stdout")
+        out += self._format_io(stderr_value, "stderr")
+        out.append(self._hbar)
+        self._printer.log_write_lines(out)
 
     def print_summary(self, *args, **kwargs):
         return self._summary_printer.print_summary(*args, **kwargs)
@@ -517,8 +594,7 @@ class SummaryPrinter:
         )
         self._printer.log_overwrite_nl(msg)
         ### Print detailed summary
-        counters = {}
-        counters_format = []
+        counters = []
         # If the detailed summary consists only in all passing tests it does
         # not deserves to be printed.
         pass_status_only = True
@@ -538,14 +614,12 @@ class SummaryPrinter:
                 if count_delta != 0:
                     s += "({:+d})".format(count_delta)
                 s += self._color.RESET
-                counters[status.value] = s
-                counters_format.append("{{{s}}} {s}".format(s=status.value))
+                counters.append(s + " " + status.value)
                 if status is not Status.PASS:
                     pass_status_only = False
         # Print detailed summary only if there were failing tests.
-        if self.should_print(len(counters_format), pass_status_only):
-            msg = " ".join(counters_format).format(**counters)
-            self._printer.log_write_nl(msg)
+        if self.should_print(len(counters), pass_status_only):
+            self._printer.log_write_nl(" ".join(counters))
 
     def should_print(self, non_zero_counters_count, pass_status_only):
         if self.summary_mode is SummaryMode.always:
@@ -681,6 +755,36 @@ class CheckCWDDidNotChanged(BaseResult):
            or self.old_cwd != new_cwd:
             raise RuntimeError("working directory changed during test")
 
+class _CaptureBuffer(io.TextIOBase):
+    """Writable text stream keeping what is written to it.
+
+    Written strings are stored as is and joined only when consumed, which
+    is cheaper than a StringIO for the many small writes of print().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, string):
+        if not isinstance(string, str):
+            raise TypeError("string argument expected, got {!r}"
+                            .format(type(string).__name__))
+        self._parts.append(string)
+        return len(string)
+
+    def consume(self):
+        """Return what has been written so far and forget it."""
+        # Most tests do not print anything.
+        if not self._parts:
+            return ""
+        value = "".join(self._parts)
+        self._parts.clear()
+        return value
+
 class CaptureStdio(BaseResult):
     """Capture and store test's stdout and stderr.
 
@@ -692,8 +796,8 @@ class CaptureStdio(BaseResult):
         self.buffer = buffer
         self._original_stdout = sys.stdout
         self._original_stderr = sys.stderr
-        self._stdout_buffer = io.StringIO()
-        self._stderr_buffer = io.StringIO()
+        self._stdout_buffer = _CaptureBuffer()
+        self._stderr_buffer = _CaptureBuffer()
         self._stdout_value = None
         self._stderr_value = None
 
@@ -705,9 +809,9 @@ class CaptureStdio(BaseResult):
     def stopTest(self, test):
         super().stopTest(test)
         if self.buffer:
-            self._stdout_value = self._stdout_buffer.getvalue()
-            self._stderr_value = self._stderr_buffer.getvalue()
             self._restoreStdout()
+            self._stdout_value = self._stdout_buffer.consume()
+            self._stderr_value = self._stderr_buffer.consume()
 
     def _setupStdout(self):
         sys.stdout = self._stdout_buffer
@@ -718,10 +822,6 @@ class CaptureStdio(BaseResult):
     def _restoreStdout(self):
         sys.stdout = self._original_stdout
         sys.stderr = self._original_stderr
-        self._stdout_buffer.seek(0)
-        self._stdout_buffer.truncate()
-        self._stderr_buffer.seek(0)
-        self._stderr_buffer.truncate()
 
     @property
     def stdout_value(self):
@@ -806,7 +906,6 @@ class StatusTracker(BaseResult):
 
     def addOutcome(self, test, status, err=None, reason=None, params=None):
         super().addOutcome(test, status, err, reason, params)
-        test_name = get_test_name(test)
         if params:
             self.subtests_status_counters.inc(status)
         else:
@@ -902,8 +1001,8 @@ class HTestResult(Walltime,
     def startTest(self, test):
         self._printer.print_message(test, Status.RUNNING, self.status_counters,
                                     self.progress,
-                                    self.stopwatch.mean_split_time,
-                                    self.stopwatch.last_split_time)
+                                    self.stopwatch.mean_split_time_in_ms,
+                                    self.stopwatch.last_split_ns)
         super().startTest(test)
 
     def stopTest(self, test):
@@ -919,8 +1018,8 @@ class HTestResult(Walltime,
         super().addOutcome(test, status, err, reason, params)
         self._printer.print_message(test, status, self.status_counters,
                                     self.progress,
-                                    self.stopwatch.mean_split_time,
-                                    self.stopwatch.last_split_time,
+                                    self.stopwatch.mean_split_time_in_ms,
+                                    self.stopwatch.last_split_ns,
                                     err=err, reason=reason,
                                     params=_serialize_subtest_params(params))
 
@@ -957,6 +1056,52 @@ TestResultMsg \
                   "total_time", # The total execution time of a test.
                   "results"))   # A list of SubtestResult object.
 
+# Most result messages are about a test with a single outcome, no error and
+# no output. They are packed in a compact binary form instead of being
+# pickled. The marker cannot be confused with the first byte of a pickle.
+_PACKED_RESULT_MARKER = b"\x01"
+_PACKED_RESULT_HEADER = struct.Struct("<HBq")
+_STATUSES = tuple(Status)
+_STATUS_INDEXES = {status: i for i, status in enumerate(_STATUSES)}
+_MICROSECOND = timedelta(microseconds=1)
+
+def pack_result_msg(worker_id, msg):
+    """Pack the result message *msg* sent by the worker *worker_id*.
+
+    Return None if the message cannot be packed.
+    """
+    if msg.stdout or msg.stderr or msg.total_time is None \
+       or len(msg.results) != 1:
+        return None
+    result = msg.results[0]
+    if result.error is not None or result.reason is not None or result.params:
+        return None
+    try:
+        header = _PACKED_RESULT_HEADER.pack(worker_id,
+                                            _STATUS_INDEXES[result.status],
+                                            msg.total_time // _MICROSECOND)
+    except struct.error:
+        # The worker id or the total time does not fit.
+        return None
+    return _PACKED_RESULT_MARKER + header + msg.test_name.encode()
+
+def unpack_worker_msg(data):
+    """Return the (worker_id, obj) tuple sent by a worker as *data*."""
+    if data[:1] != _PACKED_RESULT_MARKER:
+        return pickle.loads(data)
+    worker_id, status_index, total_time \
+        = _PACKED_RESULT_HEADER.unpack_from(data, 1)
+    result = SubtestResult(status=_STATUSES[status_index],
+                           error=None,
+                           reason=None,
+                           params=None)
+    msg = TestResultMsg(stdout="",
+                        stderr="",
+                        test_name=data[1+_PACKED_RESULT_HEADER.size:].decode(),
+                        total_time=timedelta(microseconds=total_time),
+                        results=[result])
+    return (worker_id, msg)
+
 class HTestResultClient(CheckCWDDidNotChanged,
                         Failfast,
                         CaptureStdio,
@@ -988,7 +1133,11 @@ class HTestResultClient(CheckCWDDidNotChanged,
                             stderr=self.stderr_value,
                             results=self._sub_results,
                             **self._result_attrs)
-        self._conn.send((self._worker_id, msg))
+        data = pack_result_msg(self._worker_id, msg)
+        if data is None:
+            self._conn.send((self._worker_id, msg))
+        else:
+            self._conn.send_bytes(data)
         self._result_attrs = None
         self._sub_results = []
 
@@ -1030,13 +1179,14 @@ class HTestResultServer(Walltime,
         self._printer = result_printer
         # The last result message received.
         self._last_result_msg = None
-        # Store the sum of the execution time of each finished tests.
-        self._total_split_time = timedelta(0)
+        # Store the sum of the execution time of each finished tests, in
+        # microseconds to save a timedelta allocation per test.
+        self._total_split_us = 0
 
     def process_result(self, result_msg):
         ### Update internal state.
         self._last_result_msg = result_msg
-        self._total_split_time += self.last_split_time
+        self._total_split_us += self.last_split_time // _MICROSECOND
         # Force reset here because startTest() last call may have been for
         # another test than us since several are running in parallel. The
         # effect is that the header will always be printed but it is
@@ -1053,8 +1203,8 @@ class HTestResultServer(Walltime,
     def startTest(self, test):
         self._printer.print_message(test, Status.RUNNING, self.status_counters,
                                     self.progress,
-                                    self.mean_split_time,
-                                    self.last_split_time)
+                                    self.mean_split_time_in_ms,
+                                    self.last_split_ns)
         super().startTest(test)
 
     def stopTest(self, test):
@@ -1074,8 +1224,8 @@ class HTestResultServer(Walltime,
         super().addOutcome(test, status, err, reason, params)
         self._printer.print_message(test, status, self.status_counters,
                                     self.progress,
-                                    self.mean_split_time,
-                                    self.last_split_time,
+                                    self.mean_split_time_in_ms,
+                                    self.last_split_ns,
                                     err=err, reason=reason, params=params)
 
     def print_summary(self):
@@ -1099,12 +1249,24 @@ class HTestResultServer(Walltime,
             return
         return self._last_result_msg.total_time
 
+    @property
+    def last_split_ns(self):
+        if self._last_result_msg is None:
+            return
+        return self._last_result_msg.total_time // _MICROSECOND * 1000
+
     @property
     def mean_split_time(self):
         if self.testsRun == 0:
             return timedelta(0)
-        return self.total_split_time / self.testsRun
+        return timedelta(microseconds=self._total_split_us // self.testsRun)
+
+    @property
+    def mean_split_time_in_ms(self):
+        if self.testsRun == 0:
+            return 0.0
+        return self._total_split_us / self.testsRun / 1000
 
     @property
     def total_split_time(self):
-        return self._total_split_time
+        return timedelta(microseconds=self._total_split_us)